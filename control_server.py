@@ -0,0 +1,115 @@
+import os
+import json
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+SERVER_NAME = "ChirPet"
+
+def parse_cli_commands(args):
+    if not args:
+        return [{'cmd': 'spawn'}]
+
+    name = args[0]
+    if name == 'json':
+        payload = json.loads(args[1])
+        return payload if isinstance(payload, list) else [payload]
+    if name == 'spawn':
+        command = {'cmd': 'spawn'}
+        if len(args) > 1:
+            command['style'] = args[1]
+        return [command]
+    if name == 'style':
+        return [{'cmd': 'style', 'name': args[1]}]
+    if name == 'record':
+        if args[1] == 'stop':
+            return [{'cmd': 'record'}]
+        return [{'cmd': 'record', 'path': os.path.abspath(args[1])}]
+    if name in ('feed', 'state', 'metrics', 'close'):
+        return [{'cmd': name}]
+    raise ValueError(f"Unknown command: {name}")
+
+def send_commands(commands, timeout_ms=1000):
+    socket = QLocalSocket()
+    socket.connectToServer(SERVER_NAME)
+    if not socket.waitForConnected(timeout_ms):
+        return None
+
+    socket.write((json.dumps(commands) + "\n").encode("utf-8"))
+    socket.waitForBytesWritten(timeout_ms)
+
+    reply = b""
+    while not reply.endswith(b"\n"):
+        if not socket.waitForReadyRead(timeout_ms):
+            break
+        reply += bytes(socket.readAll())
+    socket.disconnectFromServer()
+
+    if not reply:
+        # Someone owns the name but is hung; starting a second instance would steal it
+        raise TimeoutError(f"{SERVER_NAME} is running but did not answer within {timeout_ms} ms")
+    return json.loads(reply)
+
+class ControlServer(QObject):
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+        self.buffers = {}
+        self.commands_handled = 0
+
+    def listen(self):
+        if self.server.listen(SERVER_NAME):
+            return True
+        probe = QLocalSocket()
+        probe.connectToServer(SERVER_NAME)
+        if probe.waitForConnected(200):
+            probe.disconnectFromServer()
+            return False
+        # Nobody accepts on this name, so it is left over from a crashed instance
+        QLocalServer.removeServer(SERVER_NAME)
+        return self.server.listen(SERVER_NAME)
+
+    def close(self):
+        self.server.close()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b""
+            socket.readyRead.connect(lambda socket=socket: self.on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self.on_disconnected(socket))
+
+    def on_disconnected(self, socket):
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def on_ready_read(self, socket):
+        data = self.buffers.get(socket, b"") + bytes(socket.readAll())
+        while b"\n" in data:
+            line, data = data.split(b"\n", 1)
+            if line.strip():
+                reply = self.handle_line(line)
+                socket.write((json.dumps(reply) + "\n").encode("utf-8"))
+        self.buffers[socket] = data
+        socket.flush()
+
+    def handle_line(self, line):
+        try:
+            payload = json.loads(line)
+        except ValueError as e:
+            return {'ok': False, 'error': f"Bad JSON: {e}"}
+
+        # A list is a batch: every command runs in order within this one event
+        if isinstance(payload, list):
+            return [self.handle_command(command) for command in payload]
+        return self.handle_command(payload)
+
+    def handle_command(self, command):
+        self.commands_handled += 1
+        if not isinstance(command, dict) or 'cmd' not in command:
+            return {'ok': False, 'error': "Command must be an object with a 'cmd' field"}
+        try:
+            return self.handler(command)
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import datetime
+import threading
+
+CAPACITY = 4096
+CRASH_SECONDS = 60
+MAX_LOG_BYTES = 1024 * 1024
+
+def default_log_dir():
+    override = os.environ.get('CHIRPET_LOG_DIR')
+    if override:
+        return override
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        return os.path.join(base, 'ChirPet', 'logs')
+    if sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Logs/ChirPet')
+    base = os.environ.get('XDG_STATE_HOME') or os.path.expanduser('~/.local/state')
+    return os.path.join(base, 'chirpet', 'logs')
+
+def format_event(event):
+    seq, stamp, kind, args = event
+    when = datetime.datetime.fromtimestamp(stamp).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    return f"{when} {kind} " + " ".join(str(arg) for arg in args)
+
+class EventLog:
+    def __init__(self, capacity=CAPACITY, log_dir=None):
+        self.capacity = capacity
+        self.log_dir = log_dir or default_log_dir()
+        self.enabled = True
+        self.entries = [None] * capacity
+        self.count = 0
+        self.record_lock = threading.Lock()
+        self.flushed = 0
+        self.dropped = 0
+        self.flush_lock = threading.Lock()
+        self.flusher = None
+        self.stop_flusher = threading.Event()
+
+    def record(self, kind, *args):
+        # Runs on the hot path: one tuple and one slot store, formatting waits for the writer.
+        # Simulation threads record alongside the GUI thread; the uncontended lock keeps seqs unique
+        # and only publishes count once its slot is stored
+        if not self.enabled:
+            return
+        event_time = time.time()
+        with self.record_lock:
+            seq = self.count
+            self.entries[seq % self.capacity] = (seq, event_time, kind, args)
+            self.count = seq + 1
+
+    def events(self, since=0):
+        # Lock-free read; a slot overwritten while we copy carries a newer seq and is skipped
+        end = self.count
+        start = max(since, end - self.capacity)
+        found = []
+        for seq in range(start, end):
+            event = self.entries[seq % self.capacity]
+            if event is not None and event[0] == seq:
+                found.append(event)
+        return found, start, end
+
+    def recent(self, seconds):
+        cutoff = time.time() - seconds
+        return [event for event in self.events()[0] if event[1] >= cutoff]
+
+    def path(self, filename):
+        os.makedirs(self.log_dir, exist_ok=True)
+        return os.path.join(self.log_dir, filename)
+
+    def flush(self):
+        with self.flush_lock:
+            found, start, end = self.events(self.flushed)
+            self.dropped += start - self.flushed
+            self.flushed = end
+            if not found:
+                return 0
+            try:
+                log_path = self.path('events.log')
+                if os.path.exists(log_path) and os.path.getsize(log_path) > MAX_LOG_BYTES:
+                    os.replace(log_path, log_path + '.1')
+                with open(log_path, 'a', encoding='utf-8') as f:
+                    for event in found:
+                        f.write(format_event(event) + "\n")
+            except OSError as e:
+                print(f"Error: Could not write event log: {e}")
+            return len(found)
+
+    def start_flusher(self, interval_seconds):
+        if self.flusher is not None or interval_seconds <= 0:
+            return
+        self.stop_flusher.clear()
+        self.flusher = threading.Thread(target=self.run_flusher, args=(interval_seconds,), name='event-log-flusher', daemon=True)
+        self.flusher.start()
+
+    def run_flusher(self, interval_seconds):
+        while not self.stop_flusher.wait(interval_seconds):
+            self.flush()
+        self.flush()
+
+    def close(self):
+        if self.flusher is not None:
+            self.stop_flusher.set()
+            self.flusher.join(timeout=2)
+            self.flusher = None
+
+    def dump_crash(self, traceback_text, seconds=CRASH_SECONDS):
+        stamp = datetime.datetime.now()
+        recent = self.recent(seconds)
+        try:
+            crash_path = self.path(f"crash_{stamp.strftime('%Y%m%d_%H%M%S')}.txt")
+            with open(crash_path, 'w', encoding='utf-8') as f:
+                f.write(f"CRASH DATE: {stamp}\n")
+                f.write(traceback_text)
+                f.write(f"\nLast {seconds}s of events ({len(recent)}):\n")
+                for event in recent:
+                    f.write(format_event(event) + "\n")
+        except OSError as e:
+            print(f"Error: Could not write crash log: {e}")
+            return None
+        return crash_path
+
+events = EventLog()
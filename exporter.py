@@ -0,0 +1,348 @@
+import io
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageChops, GifImagePlugin
+from pet_system import PetSystem, RenderFrame
+
+CANVAS_SIZE = 200
+CHUNK_FRAMES = 48
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+FORMATS = {'.gif': 'GIF', '.png': 'PNG', '.apng': 'PNG', '.webp': 'WEBP'}
+
+class SessionRecorder:
+    # One JSON line per tick; style lines mark where the sheet changes
+    def __init__(self, path, tick_ms):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write(json.dumps({'tick_ms': tick_ms}) + "\n")
+        self.style_key = None
+        self.frames = 0
+
+    def write(self, style_name, loader, frame):
+        style_key = (loader.path, loader.cols, loader.rows)
+        if style_key != self.style_key:
+            self.style_key = style_key
+            self.file.write(json.dumps({'style': style_name, 'path': loader.path,
+                                        'cols': loader.cols, 'rows': loader.rows}) + "\n")
+        self.file.write(json.dumps(list(frame) if frame else None) + "\n")
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+def read_session(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        tick_ms = header.get('tick_ms', 16)
+        style = None
+        for line in f:
+            entry = json.loads(line)
+            if isinstance(entry, dict):
+                style = (entry['path'], entry['cols'], entry['rows'])
+                continue
+            frame = None
+            if entry is not None:
+                if entry[7] is not None:
+                    entry[7] = tuple(entry[7])
+                frame = RenderFrame(*entry)
+            yield tick_ms, style, frame
+
+def simulate(style_name, seconds, seed, tick_ms, feed_every):
+    from style_registry import StyleRegistry
+
+    style = StyleRegistry().get(style_name)
+    if style is None:
+        raise ValueError(f"Unknown style: {style_name}")
+    pet = PetSystem(style.path, style.name, style.manifest, seed=seed)
+    style_key = (pet.loader.path, pet.loader.cols, pet.loader.rows)
+    feed_ticks = int(feed_every * 1000 / tick_ms) if feed_every else 0
+
+    for tick in range(1, int(seconds * 1000 / tick_ms) + 1):
+        pet.update(tick_ms)
+        if feed_ticks and tick % feed_ticks == 0:
+            pet.feed()
+        yield tick_ms, style_key, pet.render_frame()
+
+def timeline(ticks, frame_ms):
+    # Resamples ticks to the export frame rate and merges runs of identical frames
+    elapsed = 0
+    next_frame = 0
+    current = None
+    for tick_ms, style_key, frame in ticks:
+        elapsed += tick_ms
+        while elapsed > next_frame:
+            next_frame += frame_ms
+            if current and current[0] == style_key and current[1] == frame:
+                current[2] += frame_ms
+            else:
+                if current:
+                    yield tuple(current)
+                current = [style_key, frame, frame_ms]
+    if current:
+        yield tuple(current)
+
+def chunks(entries, size):
+    # Each chunk uses one style so a worker only needs one sprite loader per task
+    chunk = []
+    for entry in entries:
+        if chunk and (len(chunk) >= size or chunk[-1][0] != entry[0]):
+            yield chunk
+            chunk = []
+        chunk.append(entry)
+    if chunk:
+        yield chunk
+
+_worker = {}
+
+def init_worker():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtGui import QGuiApplication
+    # QPixmap and fonts need a GUI application in every process that renders
+    if QGuiApplication.instance() is None:
+        _worker['app'] = QGuiApplication(['chirpet-exporter'])
+
+def worker_style(style_key):
+    from pet_system import get_sprite_loader, drop_sprite_loader, get_tint_cache, SpeechBubble
+
+    if _worker.get('style_key') != style_key:
+        if 'style' in _worker:
+            # Chunks arrive grouped by style, so the previous one is rarely needed again
+            drop_sprite_loader(_worker['style'][0])
+        path, cols, rows = style_key
+        loader = get_sprite_loader(path, cols, rows)
+        _worker['style_key'] = style_key
+        _worker['style'] = (loader, get_tint_cache(loader))
+    if 'speech' not in _worker:
+        _worker['speech'] = SpeechBubble()
+    return _worker['style'] + (_worker['speech'],)
+
+def quantize(image, colors):
+    # Index `colors` is left free for transparency; GIF has no partial alpha
+    alpha = image.getchannel('A')
+    indexed = image.convert('RGB').quantize(colors=colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    indexed.paste(colors, mask=alpha.point(lambda a: 255 if a < 128 else 0))
+    indexed.info['transparency'] = colors
+    return indexed
+
+def render_chunk(chunk, background, colors):
+    from PyQt6.QtGui import QImage, QPainter, QColor
+    from pet_system import frame_pixmap, paint_pet
+
+    init_worker()
+    loader, tints, speech = worker_style(chunk[0][0])
+    canvas = QImage(CANVAS_SIZE, CANVAS_SIZE, QImage.Format.Format_RGBA8888)
+    rendered = []
+    for style_key, frame, duration in chunk:
+        canvas.fill(QColor(background) if background else QColor(0, 0, 0, 0))
+        if frame is not None:
+            painter = QPainter(canvas)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            bubble_x, bubble_y, hanging = paint_pet(painter, frame, frame_pixmap(loader, tints, frame))
+            if frame.speech_text:
+                speech.paint(painter, frame.speech_text, bubble_x, bubble_y, hanging)
+            painter.end()
+        image = Image.frombytes('RGBA', (CANVAS_SIZE, CANVAS_SIZE), canvas.constBits().asstring(canvas.sizeInBytes()))
+        if colors:
+            image = quantize(image, colors)
+        rendered.append((image, duration))
+    return rendered
+
+def render(entries, workers, background, colors):
+    tasks = chunks(entries, CHUNK_FRAMES)
+    if workers <= 1:
+        for chunk in tasks:
+            yield from render_chunk(chunk, background, colors)
+        return
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker) as pool:
+        # Bounded look-ahead keeps every worker busy without holding the whole export in flight
+        pending = []
+        for chunk in tasks:
+            pending.append(pool.submit(render_chunk, chunk, background, colors))
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+def merge_identical(rendered):
+    # Different frame data can still produce the same pixels (e.g. sub-pixel bobbing)
+    last = None
+    for image, duration in rendered:
+        data = image.tobytes()
+        if image.mode == 'P':
+            data += bytes(image.getpalette())
+        if last and last[2] == data:
+            last[1] += duration
+            continue
+        if last:
+            yield last[0], last[1]
+        last = [image, duration, data]
+    if last:
+        yield last[0], last[1]
+
+class GifWriter:
+    # Frames go straight to the file; each carries its own palette because every frame is quantized separately
+    def __init__(self, output):
+        self.file = open(output, 'wb')
+        self.frames = 0
+
+    def add(self, image, duration):
+        if image.mode != 'P':
+            image = quantize(image, 255)
+        params = {'duration': duration, 'disposal': 2, 'transparency': image.info['transparency'],
+                  'include_color_table': self.frames > 0}
+        if self.frames == 0:
+            header, _ = GifImagePlugin.getheader(image, None, {'loop': 0, 'transparency': params['transparency']})
+            self.file.write(b''.join(header))
+        self.file.write(b''.join(GifImagePlugin.getdata(image, (0, 0), **params)))
+        self.frames += 1
+
+    def close(self):
+        self.file.write(b';')
+        self.file.close()
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def png_chunks(data):
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        yield kind, data[pos + 8:pos + 8 + length]
+        pos += length + 12
+
+class ApngWriter:
+    # Only the previous frame is kept, to crop each frame to the area that changed;
+    # the frame count in acTL is patched in once the last frame is written
+    def __init__(self, output):
+        self.file = open(output, 'wb')
+        self.frames = 0
+        self.sequence = 0
+        self.previous = None
+        self.actl_pos = None
+
+    def add(self, image, duration):
+        # APNG frames share one palette, so quantized frames are stored as RGBA
+        image = image.convert('RGBA')
+        box = (0, 0) + image.size
+        if self.previous is not None:
+            box = ImageChops.difference(self.previous, image).getbbox(alpha_only=False) or (0, 0, 1, 1)
+        self.previous = image
+        buffer = io.BytesIO()
+        image.crop(box).save(buffer, 'PNG')
+        chunks = list(png_chunks(buffer.getvalue()))
+
+        if self.frames == 0:
+            self.file.write(PNG_SIGNATURE + png_chunk(b'IHDR', chunks[0][1]))
+            self.actl_pos = self.file.tell()
+            self.file.write(png_chunk(b'acTL', struct.pack('>II', 0, 0)))
+        self.file.write(png_chunk(b'fcTL', struct.pack('>IIIIIHHBB', self.sequence, box[2] - box[0], box[3] - box[1],
+                                                       box[0], box[1], duration, 1000, 0, 0)))
+        self.sequence += 1
+        for kind, data in chunks:
+            if kind != b'IDAT':
+                continue
+            if self.frames == 0:
+                self.file.write(png_chunk(b'IDAT', data))
+            else:
+                self.file.write(png_chunk(b'fdAT', struct.pack('>I', self.sequence) + data))
+                self.sequence += 1
+        self.frames += 1
+
+    def close(self):
+        self.file.write(png_chunk(b'IEND', b''))
+        if self.frames:
+            self.file.seek(self.actl_pos)
+            self.file.write(png_chunk(b'acTL', struct.pack('>II', self.frames, 0)))
+        self.file.close()
+
+class WebpWriter:
+    # Pillow's save() lists every frame first; its animation encoder compresses each frame as it is
+    # added, so only the encoded file is held until the end
+    def __init__(self, output):
+        from PIL import _webp
+
+        self.output = output
+        self.encoder = _webp.WebPAnimEncoder((CANVAS_SIZE, CANVAS_SIZE), 0, 0, False, 9, 17, False, False)
+        self.timestamp = 0
+        self.frames = 0
+
+    def add(self, image, duration):
+        self.encoder.add(image.convert('RGBA').getim(), self.timestamp, True, 80, 100, 0)
+        self.timestamp += duration
+        self.frames += 1
+
+    def close(self):
+        self.encoder.add(None, self.timestamp, True, 80, 100, 0)
+        data = self.encoder.assemble('', '', '')
+        if data is None:
+            raise OSError("WebP encoder returned no data")
+        with open(self.output, 'wb') as f:
+            f.write(data)
+
+WRITERS = {'GIF': GifWriter, 'PNG': ApngWriter, 'WEBP': WebpWriter}
+
+def export(ticks, output, fps=25, workers=None, background=None, colors=None):
+    extension = os.path.splitext(output)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported export format: {extension}")
+    image_format = FORMATS[extension]
+    if colors is None:
+        colors = 255 if image_format == 'GIF' else 0
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Frames are written as they arrive so a long session never sits in memory
+    frames = merge_identical(render(timeline(ticks, 1000.0 / fps), workers, background, colors))
+    first = next(frames, None)
+    if first is None:
+        raise ValueError("Nothing to export")
+    writer = WRITERS[image_format](output)
+    try:
+        for image, duration in itertools.chain([first], frames):
+            writer.add(image, int(round(duration)))
+    finally:
+        writer.close()
+    return writer.frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a headless pet or a recorded session to an animated GIF, APNG or WebP.")
+    parser.add_argument('output', help="output file (.gif, .png/.apng or .webp)")
+    parser.add_argument('--session', help="session recorded with `main.py record PATH`; simulates a pet when omitted")
+    parser.add_argument('--style', default='Default')
+    parser.add_argument('--seconds', type=float, default=30, help="simulated seconds")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--tick-ms', type=int, default=16)
+    parser.add_argument('--feed-every', type=float, default=0, help="feed the simulated pet every N seconds")
+    parser.add_argument('--fps', type=float, default=25)
+    parser.add_argument('--workers', type=int, default=None, help="render processes (default: one per CPU; 1 renders in-process)")
+    parser.add_argument('--background', help="fill colour such as '#ffffff' instead of transparency")
+    parser.add_argument('--colors', type=int, default=None, help="palette size (default 255 for GIF, unquantized otherwise)")
+    args = parser.parse_args()
+
+    if args.session:
+        ticks = read_session(args.session)
+    else:
+        ticks = simulate(args.style, args.seconds, args.seed, args.tick_ms, args.feed_every)
+
+    started = time.perf_counter()
+    try:
+        count = export(ticks, args.output, args.fps, args.workers, args.background, args.colors)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {count} frames to {args.output} in {elapsed:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
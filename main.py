@@ -1,7 +1,9 @@
 import sys
 import os
-import datetime
+import math
+import time
 import json
+from event_log import events
 
 CONFIG_FILE = 'config.json'
 
@@ -19,38 +21,82 @@ def save_config(data):
         with open(CONFIG_FILE, 'w') as f:
             json.dump(data, f)
     except Exception as e:
-        log_startup(f"Failed to save config: {e}")
+        events.record('error', f"Failed to save config: {e}")
 from PyQt6.QtWidgets import QApplication, QMainWindow, QMenu, QSystemTrayIcon
-from PyQt6.QtCore import Qt, QTimer, QPoint, QPointF
-from PyQt6.QtGui import QPainter, QAction, QCursor, QColor, QIcon, QFont, QFontMetrics, QPolygonF
-from pet_system import PetSystem, PetState
-
-LOGGING_ENABLED = False
-
-def log_startup(msg):
-    if LOGGING_ENABLED:
-        with open("startup_log.txt", "a") as f:
-            f.write(f"{datetime.datetime.now()}: {msg}\n")
+from PyQt6.QtCore import Qt, QTimer, QPoint
+from PyQt6.QtGui import QPainter, QAction, QActionGroup, QCursor, QIcon, QPixmap
+from pet_system import PetSystem, PetState, STATE_NAMES, SpeechBubble, frame_pixmap, paint_pet, shared_loaders, drop_unused_loaders
+from control_server import ControlServer, parse_cli_commands, send_commands
+from style_registry import get_style_registry
+from memory_budget import MemoryBudget, memory_report
+from exporter import SessionRecorder
+from movement import Walker
+from screen_graph import get_screen_graph
+from simulation_thread import SimulationThread
+
+def report_crash(traceback_text):
+    events.close()
+    crash_path = events.dump_crash(traceback_text)
+    if crash_path:
+        print(f"CRASHED! See {crash_path}")
 
 def exception_hook(exctype, value, traceback_obj):
     import traceback
     traceback_text = "".join(traceback.format_exception(exctype, value, traceback_obj))
-    log_startup(f"CRASH (Uncaught): {value}")
-    log_startup(traceback_text)
-    with open("crash_log.txt", "w") as f:
-        f.write(f"CRASH DATE: {datetime.datetime.now()}\n")
-        f.write(traceback_text)
+    events.record('crash', repr(value))
+    report_crash(traceback_text)
     sys.exit(1)
 
 sys.excepthook = exception_hook
 
-log_startup("Starting main.py...")
+events.record('startup', "Starting main.py")
 print("Starting main.py...")
 
+class WindowState:
+    def __init__(self, window):
+        self.window = window
+        self.x = float(window.x())
+        self.y = float(window.y())
+        self.opacity = 1.0
+        self.applied_pos = (window.x(), window.y())
+        self.applied_opacity = window.windowOpacity()
+        self.move_calls = 0
+        self.opacity_calls = 0
+
+    def pos(self):
+        return QPoint(math.floor(self.x), math.floor(self.y))
+
+    def move_to(self, x, y):
+        self.x = float(x)
+        self.y = float(y)
+
+    def move_by(self, dx, dy):
+        self.x += dx
+        self.y += dy
+
+    def set_opacity(self, opacity):
+        self.opacity = opacity
+
+    def flush(self):
+        # Called once per frame; only values that changed reach the window system
+        target = (math.floor(self.x), math.floor(self.y))
+        if target != self.applied_pos:
+            self.window.move(*target)
+            self.applied_pos = target
+            self.move_calls += 1
+        if self.opacity != self.applied_opacity:
+            self.window.setWindowOpacity(self.opacity)
+            self.applied_opacity = self.opacity
+            self.opacity_calls += 1
+
+    def native_calls(self):
+        return self.move_calls + self.opacity_calls
+
 class PetWindow(QMainWindow):
-    def __init__(self):
-        log_startup("Initializing PetWindow")
+    def __init__(self, style_name=None, manager=None, threaded=None):
         super().__init__()
+        self.manager = manager
+        self.pet_id = 0
         
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint | 
@@ -59,20 +105,19 @@ class PetWindow(QMainWindow):
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         
-        log_startup("Initializing PetSystem...")
+        self.registry = get_style_registry()
         
-        config = load_config()
-        saved_style = config.get('style', 'Default')
+        saved_style = style_name
+        if saved_style is None:
+            config = load_config()
+            saved_style = config.get('style', 'Default')
         
-        style_path = 'assets/defaultspritesheet.png'
-        if saved_style == 'Christmas':
-            style_path = 'assets/christmasspritesheet.png'
-        elif saved_style == 'Sombrero':
-            style_path = 'assets/sombrerospritesheet.png'
-        elif saved_style == 'Melvin':
-            style_path = 'assets/melvinspritesheet.png'
-            
-        self.pet = PetSystem(style_path, saved_style)
+        style = self.registry.get(saved_style) or self.registry.get('Default')
+        if style:
+            self.pet = PetSystem(style.path, style.name, style.manifest)
+        else:
+            self.pet = PetSystem()
+        self.style_name = self.pet.style_name
 
         
         if getattr(sys, 'frozen', False):
@@ -83,273 +128,259 @@ class PetWindow(QMainWindow):
         else:
             self.pet.name = "ChirPet"
             
-        log_startup(f"PetSystem Initialized with name: {self.pet.name}")
+        events.record('pet', self.pet.name, self.style_name)
         
         self.resize(200, 200)
+        self.window_state = WindowState(self)
+        self.walker = Walker(get_screen_graph())
+        self.initial_pos_set = False
         
+        self.tick_ms = 16
         self.timer = QTimer(self)
-        self.timer.timeout.connect(self.game_loop)
-        self.timer.start(16) 
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(self.tick_ms) 
+        
+        self.speech = SpeechBubble()
+        self.recorder = None
         
         self.old_pos = None
         self.is_dragging = False
         self.click_start_pos = None
-
-    def contextMenuEvent(self, event):
-        menu = QMenu(self)
         
-        style_menu = menu.addMenu("Style")
-
-        def set_style(style_name):
-            if style_name == "Default":
-                self.pet.load_style('assets/defaultspritesheet.png', 'Default')
-            elif style_name == "Christmas":
-                self.pet.load_style('assets/christmasspritesheet.png', 'Christmas')
-            elif style_name == "Sombrero":
-                self.pet.load_style('assets/sombrerospritesheet.png', 'Sombrero')
-            elif style_name == "Melvin":
-                self.pet.load_style('assets/melvinspritesheet.png', 'Melvin')
-            
-            config = load_config()
-            config['style'] = style_name
-            save_config(config)
-            
-            self.update()
-
-        action_style_default = QAction("Default", self)
-        action_style_default.triggered.connect(lambda checked: set_style("Default"))
-        style_menu.addAction(action_style_default)
-
-        action_style_xmas = QAction("Christmas", self)
-        action_style_xmas.triggered.connect(lambda checked: set_style("Christmas"))
-        style_menu.addAction(action_style_xmas)
-
-        action_style_sombrero = QAction("Sombrero", self)
-        action_style_sombrero.triggered.connect(lambda checked: set_style("Sombrero"))
-        style_menu.addAction(action_style_sombrero)
-
-        action_style_melvin = QAction("Melvin", self)
-        action_style_melvin.triggered.connect(lambda checked: set_style("Melvin"))
-        style_menu.addAction(action_style_melvin)
+        self.build_menu()
+        
+        self.simulation = None
+        if threaded is None:
+            threaded = load_config().get('simulation_thread', False)
+        if threaded:
+            self.start_simulation()
+
+    def start_simulation(self):
+        # The pet now belongs to the simulation thread; the GUI only reads its snapshots and sends it inputs
+        self.simulation = SimulationThread(self.pet, self.walker, self.window_state.x, self.window_state.y,
+                                           self.width(), self.height(), self.tick_ms)
+        self.position_seq = 0
+        self.snapshot_seq = 0
+        self.simulation.start()
+
+    def build_menu(self):
+        self.menu = QMenu(self)
+        self.style_menu = self.menu.addMenu("Style")
+        self.style_group = QActionGroup(self)
+        self.style_group.setExclusive(True)
+        self.style_actions = {}
+        self.sync_style_actions()
 
         action_feed = QAction("Feed", self)
-        action_feed.triggered.connect(self.pet.feed)
-        menu.addAction(action_feed)
-
-        menu.addSeparator()
-
+        action_feed.triggered.connect(lambda checked: self.feed())
+        self.menu.addAction(action_feed)
 
+        self.menu.addSeparator()
         
         close_action = QAction("Close Pet", self)
         close_action.triggered.connect(self.close)
-        menu.addAction(close_action)
+        self.menu.addAction(close_action)
+
+        self.registry.styles_changed.connect(self.sync_style_actions)
+        self.registry.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+    def sync_style_actions(self):
+        names = self.registry.names()
+        for name in list(self.style_actions):
+            if name not in names:
+                action = self.style_actions.pop(name)
+                self.style_menu.removeAction(action)
+                self.style_group.removeAction(action)
+                action.deleteLater()
+
+        for position, name in enumerate(names):
+            action = self.style_actions.get(name)
+            if action is None:
+                action = QAction(name, self)
+                action.setCheckable(True)
+                action.triggered.connect(lambda checked, name=name: self.set_style(name))
+                self.style_group.addAction(action)
+                self.style_actions[name] = action
+                thumbnail = self.registry.thumbnail(name)
+                if thumbnail is not None:
+                    action.setIcon(QIcon(QPixmap.fromImage(thumbnail)))
+
+            current = self.style_menu.actions()
+            if position >= len(current):
+                self.style_menu.addAction(action)
+            elif current[position] is not action:
+                self.style_menu.insertAction(current[position], action)
+
+        if self.style_name in self.style_actions:
+            self.style_actions[self.style_name].setChecked(True)
+
+    def on_thumbnail_ready(self, name, mtime, image):
+        action = self.style_actions.get(name)
+        if action:
+            action.setIcon(QIcon(QPixmap.fromImage(image)))
+
+    def contextMenuEvent(self, event):
+        self.registry.refresh()
+        self.menu.exec(event.globalPos())
+
+    def set_style(self, style_name):
+        style = self.registry.get(style_name)
+        if style is None and self.registry.refresh():
+            style = self.registry.get(style_name)
+        if style is None:
+            raise ValueError(f"Unknown style: {style_name}")
+        if self.simulation:
+            self.simulation.send('style', style.path, style.name, style.manifest)
+        else:
+            self.pet.load_style(style.path, style.name, style.manifest)
+        self.style_name = style.name
+        if style.name in self.style_actions:
+            self.style_actions[style.name].setChecked(True)
+        
+        config = load_config()
+        config['style'] = style_name
+        save_config(config)
         
-        menu.exec(event.globalPos())
+        self.update()
+
+    def feed(self):
+        if self.simulation:
+            self.simulation.send('feed')
+        else:
+            self.pet.feed()
+
+    def describe(self):
+        # The simulation thread owns the pet, so its fields come from the last published snapshot
+        if self.simulation:
+            source = self.simulation.snapshot()
+            state = source.state
+        else:
+            source = self.pet
+            state = source.current_state
+        pos = self.window_state.pos()
+        return {
+            'pet': self.pet_id,
+            'name': source.name,
+            'style': self.style_name,
+            'state': STATE_NAMES.get(state, state),
+            'mood': source.mood,
+            'hunger': source.hunger,
+            'energy': source.energy,
+            'x': pos.x(),
+            'y': pos.y(),
+        }
+
+    def tick(self):
+        started = time.perf_counter()
+        self.game_loop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > self.tick_ms:
+            events.record('slow_tick', self.pet_id, round(elapsed_ms, 2))
+        if self.recorder:
+            frame, loader, tints = self.current_frame()
+            self.recorder.write(self.style_name, loader, frame)
+
+    def start_recording(self, path):
+        self.stop_recording()
+        self.recorder = SessionRecorder(path, self.tick_ms)
+        events.record('record', self.pet_id, path)
+
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def screen_geometry(self, pos):
+        current_screen = QApplication.screenAt(pos)
+        if not current_screen:
+            current_screen = QApplication.primaryScreen()
+        return current_screen.availableGeometry()
+
+    def current_frame(self):
+        if self.simulation:
+            snapshot = self.simulation.snapshot()
+            return snapshot.frame, snapshot.loader, snapshot.tints
+        return self.pet.render_frame(), self.pet.loader, self.pet.tints
+
+    def sync_position(self):
+        if self.simulation:
+            self.position_seq = self.simulation.send('move', self.window_state.x, self.window_state.y)
+        else:
+            self.walker.reset()
 
     def game_loop(self):
+        if self.simulation:
+            self.sync_simulation()
+            return
+
         if self.old_pos:
+            self.window_state.flush()
             return
 
         mouse_pos = QCursor.pos()
-        window_pos = self.pos()
+        window_pos = self.window_state.pos()
         
-        self.pet.update(16, mouse_pos, window_pos)
+        self.pet.update(self.tick_ms, mouse_pos, window_pos)
+        self.pet.prefetch_frames()
         
         if self.is_dragging:
+            self.window_state.flush()
             return
 
-        if self.pet.current_state in [PetState.MOVE_RIGHT, PetState.MOVE_LEFT, PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT, PetState.ZOOMIES, PetState.CHASE]:
-            current_screen = QApplication.screenAt(self.pos())
-            if not current_screen:
-                current_screen = QApplication.primaryScreen()
-            screen_geo = current_screen.availableGeometry()
-            
-            speed = 3
-            if self.pet.current_state == PetState.ZOOMIES:
-                speed = 10
-            elif self.pet.current_state == PetState.CHASE:
-                speed = 4
-            
-            move_x = 0
-            move_y = 0
-            
-            if self.pet.current_state == PetState.CHASE:
-                window_center_x = self.x() + self.width() // 2
-                dx = mouse_pos.x() - window_center_x
-                
-                if abs(dx) < 20:
-                    move_x = 0
-                    if self.pet.current_state == PetState.CHASE:
-                        self.pet.set_state(PetState.IDLE)
-                elif dx > 0:
-                    move_x = speed
-                    self.pet.direction = 1
-                elif dx < 0:
-                    move_x = -speed
-                    self.pet.direction = -1
-            elif self.pet.current_state == PetState.MOONWALK_RIGHT:
-                move_x = speed
-                self.pet.direction = -1 
-            elif self.pet.current_state == PetState.MOONWALK_LEFT:
-                move_x = -speed
-                self.pet.direction = 1 
-            else:
-                move_x = self.pet.direction * speed
+        x, y = self.walker.step(self.pet, self.window_state.x, self.window_state.y, self.width(), self.height(), mouse_pos.x())
+        self.window_state.move_to(x, y)
             
-            new_x = self.x() + move_x
-            target_y = self.y()
-            
-            if new_x < screen_geo.left():
-                if move_x < 0: 
-                    new_x = screen_geo.left()
-                    if self.pet.current_state == PetState.ZOOMIES:
-                        self.pet.direction = 1 
-                        pass 
-                    elif self.pet.current_state in [PetState.MOVE_RIGHT, PetState.MOVE_LEFT]:
-                        self.pet.set_state(PetState.MOVE_RIGHT)
-                    elif self.pet.current_state in [PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT, PetState.CHASE]:
-                        self.pet.set_state(PetState.IDLE)
-                    
-            elif new_x + self.width() > screen_geo.right():
-                if move_x > 0: 
-                    new_x = screen_geo.right() - self.width()
-                    if self.pet.current_state == PetState.ZOOMIES:
-                        self.pet.direction = -1 
-                        pass
-                    elif self.pet.current_state in [PetState.MOVE_RIGHT, PetState.MOVE_LEFT]:
-                        self.pet.set_state(PetState.MOVE_LEFT)
-                    elif self.pet.current_state in [PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT, PetState.CHASE]:
-                        self.pet.set_state(PetState.IDLE)
-            
-            self.move(new_x, target_y)
-            
-        self.setWindowOpacity(1.0)
+        self.window_state.set_opacity(1.0)
             
         if self.pet.current_state == PetState.CORNER_POP:
-            if not hasattr(self, 'pop_stage'):
-                self.pop_stage = 'INIT'
-                self.pop_timer = 0
-                self.saved_pos = self.pos()
             self.pet.rotation = 0
-            if hasattr(self, 'saved_pos'):
-                self.move(self.saved_pos)
-                del self.saved_pos
-            del self.pop_stage
 
+        self.window_state.flush()
         self.update()
 
+    def sync_simulation(self):
+        simulation = self.simulation
+        cursor = QCursor.pos()
+        simulation.cursor = (cursor.x(), cursor.y())
+
+        snapshot = simulation.snapshot()
+        if snapshot.seq != self.snapshot_seq:
+            self.snapshot_seq = snapshot.seq
+            # Snapshots taken before the latest drag or placement would pull the window back
+            if not self.old_pos and snapshot.input_seq >= self.position_seq:
+                self.window_state.move_to(snapshot.window_x, snapshot.window_y)
+            snapshot.loader.prefetch(snapshot.prefetch, 1)
+            self.update()
+        self.window_state.flush()
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
         
-        render_data = self.pet.get_render_data()
+        frame, loader, tints = self.current_frame()
         
-        if render_data:
-            pixmap, offset_x, offset_y, scale_x, scale_y, rotation, color_tint = render_data
-            
-            base_x = 44
-            base_y = 104
-            
-            draw_x = base_x + offset_x
-            draw_y = base_y + offset_y
-            
-            if not hasattr(self, 'initial_pos_set'):
-                current_screen = QApplication.screenAt(QCursor.pos()) 
-                if not current_screen:
-                    current_screen = QApplication.primaryScreen()
-                screen_geo = current_screen.availableGeometry()
+        if frame:
+            if not self.initial_pos_set:
+                screen_geo = self.screen_geometry(QCursor.pos())
                 target_y = screen_geo.bottom() - 200
-                self.move(screen_geo.right() - 300, target_y)
+                self.window_state.move_to(screen_geo.right() - 300, target_y)
+                self.sync_position()
                 self.initial_pos_set = True
 
-            painter.save()
-            
-            anchor_x = 56
-            anchor_y = 96
-            
-            if self.pet.current_state in [PetState.SPIN, PetState.DRAG]:
-                anchor_x = 56
-                anchor_y = 48
-            
-            painter.translate(draw_x + anchor_x, draw_y + anchor_y)
-            
-            front_facing_states = [
-                PetState.IDLE, PetState.IDLE_WINK, 
-                PetState.SPEAK, PetState.SLEEP, 
-                PetState.SPAWN, PetState.LOOK_SEQUENCE,
-                PetState.FLAP, PetState.PUFF,
-                PetState.FLAP_HARD, PetState.INQUISITIVE,
-                PetState.SPIN, PetState.JUMP,
-                PetState.SHAKE, PetState.GHOST,
-                PetState.DRAG,
-                PetState.MOVE_LEFT, PetState.MOONWALK_RIGHT
-            ]
-            if self.pet.direction == -1 and self.pet.current_state not in front_facing_states:
-                painter.scale(-1, 1)
-            
-            if rotation != 0:
-                painter.rotate(rotation)
-                
-            if scale_x != 1.0 or scale_y != 1.0:
-                painter.scale(scale_x, scale_y)
-                
-            painter.drawPixmap(-anchor_x, -anchor_y, pixmap)
-            
-            if color_tint:
-                painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceAtop)
-                if isinstance(color_tint, float): 
-                    color = QColor.fromHslF(color_tint, 1.0, 0.5)
-                    color.setAlpha(100) 
-                    painter.fillRect(int(draw_x), int(draw_y), pixmap.width(), pixmap.height(), color)
-                elif isinstance(color_tint, QColor): 
-                    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Overlay)
-                    color_tint.setAlpha(200) 
-                    painter.fillRect(int(draw_x), int(draw_y), pixmap.width(), pixmap.height(), color_tint)
-                
-            painter.restore()
+            bubble_x, bubble_y, hanging = paint_pet(painter, frame, frame_pixmap(loader, tints, frame))
 
-            if self.pet.speech_text:
-                painter.save()
-                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-                
-                font = QFont("Arial", 10)
-                painter.setFont(font)
-                metrics = QFontMetrics(font)
-                text = self.pet.speech_text
-                text_width = metrics.horizontalAdvance(text)
-                text_height = metrics.height()
-                
-                bubble_padding = 10
-                bubble_w = text_width + bubble_padding * 2
-                bubble_h = text_height + bubble_padding * 2
-                
-                bubble_x = draw_x + anchor_x - bubble_w / 2
-                bubble_y = draw_y - bubble_h - 10
-                
-                path = QPolygonF()
-                path.append(QPointF(bubble_x, bubble_y))
-                path.append(QPointF(bubble_x + bubble_w, bubble_y))
-                path.append(QPointF(bubble_x + bubble_w, bubble_y + bubble_h))
-                path.append(QPointF(bubble_x + bubble_w / 2 + 5, bubble_y + bubble_h))
-                path.append(QPointF(bubble_x + bubble_w / 2, bubble_y + bubble_h + 10))
-                path.append(QPointF(bubble_x + bubble_w / 2 - 5, bubble_y + bubble_h))
-                path.append(QPointF(bubble_x, bubble_y + bubble_h))
-                path.append(QPointF(bubble_x, bubble_y))
-                
-                painter.setBrush(QColor(255, 255, 255))
-                painter.setPen(QColor(0, 0, 0))
-                painter.drawPolygon(path)
-                
-                painter.drawText(int(bubble_x + bubble_padding), int(bubble_y + bubble_padding + metrics.ascent()), text)
-                
-                painter.restore()
+            if frame.speech_text:
+                self.speech.paint(painter, frame.speech_text, bubble_x, bubble_y, hanging)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self.old_pos = event.globalPosition().toPoint()
             self.click_start_pos = event.globalPosition().toPoint()
             self.is_dragging = False
-            self.pet.handle_interaction('click')
+            if self.simulation:
+                self.simulation.send('press')
+            else:
+                self.pet.handle_interaction('click')
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -357,6 +388,8 @@ class PetWindow(QMainWindow):
             if self.is_dragging:
                 pass
             self.is_dragging = False
+            if self.simulation:
+                self.simulation.send('release')
 
     def mouseMoveEvent(self, event):
         if self.old_pos:
@@ -369,33 +402,168 @@ class PetWindow(QMainWindow):
                     self.is_dragging = True
             
             if self.is_dragging:
-                self.move(self.x() + delta.x(), self.y() + delta.y())
+                self.window_state.move_by(delta.x(), delta.y())
+                self.sync_position()
                 
             self.old_pos = current_pos
 
     def closeEvent(self, event):
-        log_startup("Closing PetWindow...")
+        events.record('close', self.pet_id)
         self.timer.stop()
+        if self.simulation:
+            self.simulation.stop()
+        self.stop_recording()
         event.accept()
-        QApplication.instance().quit()
+        if self.manager:
+            self.manager.window_closed(self)
+        else:
+            QApplication.instance().quit()
+
+class PetManager:
+    def __init__(self, app):
+        self.app = app
+        self.windows = []
+        self.next_id = 0
+        self.server = ControlServer(self.handle_command)
+        
+        self.budget = None
+        budget_mb = load_config().get('memory_budget_mb')
+        if budget_mb:
+            self.budget = MemoryBudget(int(budget_mb * 1024 * 1024))
+        self.housekeeping_timer = QTimer()
+        self.housekeeping_timer.timeout.connect(self.housekeeping)
+        self.housekeeping_timer.start(1000)
+
+    def pets(self):
+        return [window.pet for window in self.windows]
+
+    def housekeeping(self):
+        pets = self.pets()
+        drop_unused_loaders(pets)
+        if self.budget:
+            self.budget.enforce(pets)
+
+    def spawn(self, style_name=None):
+        window = PetWindow(style_name, manager=self)
+        window.pet_id = self.next_id
+        window.pet.pet_id = self.next_id
+        self.next_id += 1
+        window.setWindowTitle("ChirPet")
+        window.show()
+        self.windows.append(window)
+        events.record('spawn', window.pet_id, window.style_name)
+        return window
+
+    def window_closed(self, window):
+        if window in self.windows:
+            self.windows.remove(window)
+        if not self.windows:
+            self.server.close()
+            self.app.quit()
+
+    def targets(self, command):
+        if 'pet' not in command:
+            return list(self.windows)
+        matches = [window for window in self.windows if window.pet_id == command['pet']]
+        if not matches:
+            raise ValueError(f"No pet with id {command['pet']}")
+        return matches
+
+    def metrics(self):
+        loaders = shared_loaders()
+        return {
+            'pets': len(self.windows),
+            'loaders': len(loaders),
+            'resident_frames': sum(loader.resident_count() for loader in loaders),
+            'native_window_calls': sum(window.window_state.native_calls() for window in self.windows),
+            'commands_handled': self.server.commands_handled,
+            'events_recorded': events.count,
+            'memory': memory_report(self.pets()),
+        }
+
+    def handle_command(self, command):
+        name = command['cmd']
+        if name == 'spawn':
+            window = self.spawn(command.get('style'))
+            return {'ok': True, 'pet': window.pet_id}
+        if name == 'feed':
+            for window in self.targets(command):
+                window.feed()
+            return {'ok': True}
+        if name == 'style':
+            for window in self.targets(command):
+                window.set_style(command['name'])
+            return {'ok': True}
+        if name == 'state':
+            return {'ok': True, 'pets': [window.describe() for window in self.targets(command)]}
+        if name == 'metrics':
+            return {'ok': True, 'metrics': self.metrics()}
+        if name == 'record':
+            windows = self.targets(command)
+            if 'path' not in command:
+                for window in windows:
+                    window.stop_recording()
+                return {'ok': True}
+            paths = []
+            for window in windows:
+                path = command['path']
+                if len(windows) > 1:
+                    stem, extension = os.path.splitext(path)
+                    path = f"{stem}-{window.pet_id}{extension}"
+                window.start_recording(path)
+                paths.append(path)
+            return {'ok': True, 'paths': paths}
+        if name == 'close':
+            for window in self.targets(command):
+                window.close()
+            return {'ok': True}
+        raise ValueError(f"Unknown command: {name}")
+
+def run_startup_commands(manager, commands):
+    if not any(isinstance(command, dict) and command.get('cmd') == 'spawn' for command in commands):
+        manager.spawn()
+    for command in commands:
+        reply = manager.server.handle_command(command)
+        if not reply.get('ok'):
+            print(f"Error: {reply.get('error')}")
 
 if __name__ == "__main__":
     try:
-        log_startup("Entering main block")
         app = QApplication(sys.argv)
         app.setApplicationName("ChirPet")
-        log_startup("QApplication created")
-        window = PetWindow()
-        window.setWindowTitle("ChirPet")
-        log_startup("Window created, showing...")
-        window.show()
-        log_startup("Window shown, executing app...")
-        sys.exit(app.exec())
+        events.record('startup', "QApplication created")
+        
+        try:
+            commands = parse_cli_commands(sys.argv[1:])
+        except (ValueError, IndexError) as e:
+            print(f"Usage: main.py [spawn [STYLE] | feed | style NAME | state | metrics | record PATH | record stop | close | json PAYLOAD] ({e})")
+            sys.exit(2)
+        try:
+            reply = send_commands(commands)
+        except TimeoutError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if reply is not None:
+            print(json.dumps(reply))
+            sys.exit(0)
+        
+        config = load_config()
+        events.enabled = config.get('event_log', True)
+        events.start_flusher(config.get('event_log_flush_seconds', 0))
+        
+        manager = PetManager(app)
+        if not manager.server.listen():
+            print(f"Error: Control server failed to listen: {manager.server.server.errorString()}")
+            sys.exit(1)
+        
+        # Run inside the event loop so a startup `close` can actually quit the app
+        QTimer.singleShot(0, lambda: run_startup_commands(manager, commands))
+        events.record('startup', "Executing app")
+        exit_code = app.exec()
+        events.close()
+        sys.exit(exit_code)
     except Exception as e:
         import traceback
-        log_startup(f"CRASH: {e}")
-        log_startup(traceback.format_exc())
-        with open("crash_log.txt", "w") as f:
-            f.write(traceback.format_exc())
-        print("CRASHED! See crash_log.txt")
+        events.record('crash', repr(e))
+        report_crash(traceback.format_exc())
         traceback.print_exc()
@@ -0,0 +1,131 @@
+import os
+import sys
+from pet_system import PetState, shared_loaders, shared_tint_caches, drop_unused_loaders
+
+TINT_STATES = (PetState.DISCO, PetState.PULSE)
+
+def process_rss():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def sprite_bytes(pets):
+    total = sum(loader.pixmap_bytes() + loader.sheet_bytes() for loader in shared_loaders())
+    return total + sum(tints.pixmap_bytes() for tints in shared_tint_caches())
+
+def memory_report(pets):
+    active = {id(pet.loader) for pet in pets}
+    styles = {}
+    for loader in shared_loaders():
+        names = sorted({pet.style_name for pet in pets if pet.loader is loader})
+        name = ", ".join(names) if names else os.path.basename(loader.path)
+        styles[name] = {
+            'active': id(loader) in active,
+            'resident_frames': loader.resident_count(),
+            'pixmap_bytes': loader.pixmap_bytes(),
+            'sheet_bytes': loader.sheet_bytes(),
+            'sheet_decodes': loader.sheet_decodes,
+            'band_decodes': loader.band_decodes,
+            'peak_load_estimate': loader.peak_load_estimate,
+        }
+    tint_bytes = sum(tints.pixmap_bytes() for tints in shared_tint_caches())
+    return {
+        'styles': styles,
+        'tint_bytes': tint_bytes,
+        'sprite_bytes': sprite_bytes(pets),
+        'peak_load_estimate': max([style['peak_load_estimate'] for style in styles.values()] or [0]),
+        'rss': process_rss(),
+    }
+
+class MemoryBudget:
+    def __init__(self, limit_bytes, keep_recent=12):
+        self.limit_bytes = limit_bytes
+        self.keep_recent = keep_recent
+        self.styles_evicted = 0
+        self.sheets_released = 0
+        self.frames_evicted = 0
+
+    def enforce(self, pets):
+        # Cheapest to rebuild first: unused styles, then decoded sheets, tints and finally cold frames
+        usage = sprite_bytes(pets)
+        if usage <= self.limit_bytes:
+            return usage
+
+        self.styles_evicted += drop_unused_loaders(pets)
+        usage = sprite_bytes(pets)
+
+        for loader in shared_loaders():
+            if usage <= self.limit_bytes:
+                return usage
+            if loader.sheet is not None:
+                usage -= loader.sheet_bytes()
+                loader.release_sheet()
+                self.sheets_released += 1
+
+        # A style's tints are shared, so they stay while any pet on it is tinted
+        tinted = {id(pet.tints) for pet in pets if pet.current_state in TINT_STATES}
+        for tints in shared_tint_caches():
+            if usage <= self.limit_bytes:
+                return usage
+            if id(tints) not in tinted:
+                usage -= tints.pixmap_bytes()
+                tints.clear()
+
+        # The animation a pet is playing and the one it heads into would only be decoded straight back;
+        # further guesses may go, and the prefetcher leaves evicted frames alone until they are shown
+        planned = {}
+        for pet in pets:
+            anim = pet.animations[pet.current_state]
+            keep = planned.setdefault(id(pet.loader), set())
+            keep.update(pet.animation_frames(pet.current_state))
+            if 'next' in anim:
+                keep.update(pet.animations[anim['next']]['frames'])
+
+        cold = []
+        for loader in shared_loaders():
+            keep = planned.get(id(loader), ())
+            resident = [(loader.last_used[index], index) for index, pixmap in enumerate(loader.sprites)
+                        if pixmap is not None and index not in keep]
+            resident.sort()
+            cold.extend((used, id(loader), index, loader) for used, index in resident[:-self.keep_recent])
+        cold.sort(key=lambda entry: entry[0])
+
+        for used, loader_id, index, loader in cold:
+            if usage <= self.limit_bytes:
+                break
+            usage -= loader.evict(index)
+            self.frames_evicted += 1
+        return usage
@@ -0,0 +1,131 @@
+from pet_system import PetState
+from screen_graph import FLOOR, CEILING
+
+CEILING_STATES = (PetState.CEILING_WALK_LEFT, PetState.CEILING_WALK_RIGHT)
+
+WALKING_STATES = (PetState.MOVE_RIGHT, PetState.MOVE_LEFT, PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT, PetState.ZOOMIES, PetState.CHASE) + CEILING_STATES
+
+WALK_SPEEDS = {PetState.ZOOMIES: 10, PetState.CHASE: 4}
+
+# Chance that a walk which runs into a wall climbs it and carries on upside down along the ceiling
+CLIMB_CHANCE = 0.5
+
+def walk_velocity(state, direction, x, width, mouse_x):
+    speed = WALK_SPEEDS.get(state, 3)
+
+    if state == PetState.CHASE:
+        dx = mouse_x - (x + width // 2)
+        if abs(dx) < 20:
+            return 0, direction, PetState.IDLE
+        if dx > 0:
+            return speed, 1, None
+        return -speed, -1, None
+    if state == PetState.MOONWALK_RIGHT:
+        return speed, -1, None
+    if state == PetState.MOONWALK_LEFT:
+        return -speed, 1, None
+    return direction * speed, direction, None
+
+def clamp_to(segment, x, width):
+    # Ends that link to another screen stay open so the pet can walk across
+    if segment.next is None:
+        x = min(x, segment.right - width)
+    if segment.prev is None:
+        x = max(x, segment.left)
+    return x
+
+def walk_step(state, direction, x, y, width, height, mouse_x, surfaces, segment, rng):
+    # Pure apart from the climb roll; returns (x, y, direction, next state or None, segment)
+    move_x, direction, next_state = walk_velocity(state, direction, x, width, mouse_x)
+    new_x = x + move_x
+    if segment is None:
+        # No screens at all, so there is nothing to walk on or be stopped by
+        return new_x, y, direction, next_state, segment
+
+    current = surfaces.segments[segment]
+    if next_state is not None or move_x == 0:
+        return clamp_to(current, new_x, width), y, direction, next_state, segment
+    on_ceiling = current.kind == CEILING
+    if on_ceiling:
+        y = current.y
+    # Pets dragged into mid-air walk at their own height but still stop where the floor below ends
+    standing = on_ceiling or abs(y - (current.y - height)) < 1
+
+    heading = 1 if move_x > 0 else -1
+    if heading > 0 and new_x + width <= current.right:
+        return clamp_to(current, new_x, width), y, direction, None, segment
+    if heading < 0 and new_x >= current.left:
+        return clamp_to(current, new_x, width), y, direction, None, segment
+
+    link = current.next if heading > 0 else current.prev
+    if link is not None:
+        # Hand over to the neighbouring screen once the pet's middle passes the shared edge
+        center = new_x + width / 2
+        if (heading > 0 and center > current.right) or (heading < 0 and center < current.left):
+            target = surfaces.segments[link]
+            if standing:
+                y = target.y if on_ceiling else target.y - height
+            segment = link
+        return new_x, y, direction, None, segment
+
+    new_x = current.right - width if heading > 0 else current.left
+    turn = PetState.MOVE_LEFT if heading > 0 else PetState.MOVE_RIGHT
+
+    if on_ceiling:
+        floor = surfaces.locate(FLOOR, new_x + width / 2, y)
+        if floor is not None:
+            y = surfaces.segments[floor].y - height
+        return new_x, y, direction, turn, floor
+
+    if state == PetState.ZOOMIES:
+        return new_x, y, -heading, None, segment
+
+    if state in (PetState.MOVE_RIGHT, PetState.MOVE_LEFT):
+        if standing and rng.random() < CLIMB_CHANCE:
+            ceiling = surfaces.locate(CEILING, new_x + width / 2, y)
+            if ceiling is not None:
+                climb = PetState.CEILING_WALK_LEFT if heading > 0 else PetState.CEILING_WALK_RIGHT
+                return new_x, surfaces.segments[ceiling].y, direction, climb, ceiling
+        return new_x, y, direction, turn, segment
+
+    return new_x, y, direction, PetState.IDLE, segment
+
+class Walker:
+    def __init__(self, graph):
+        self.graph = graph
+        self.surfaces = None
+        self.segment = None
+        self.on_ceiling = False
+
+    def reset(self):
+        # After a drag the pet has to find the surface under it again
+        self.surfaces = None
+
+    def locate(self, kind, x, y, width, height):
+        self.surfaces = self.graph.surfaces
+        probe_y = y if kind == CEILING else y + height
+        self.segment = self.surfaces.locate(kind, x + width / 2, probe_y)
+
+    def step(self, pet, x, y, width, height, mouse_x):
+        state = pet.current_state
+        if self.on_ceiling and state not in CEILING_STATES:
+            # Anything that interrupts a ceiling walk drops the pet back to the floor
+            self.on_ceiling = False
+            self.locate(FLOOR, x, y, width, height)
+            if self.segment is not None:
+                y = self.surfaces.segments[self.segment].y - height
+
+        if state not in WALKING_STATES:
+            return x, y
+
+        kind = CEILING if state in CEILING_STATES else FLOOR
+        # locate() only comes back empty when there are no screens; retrying that every tick would not help
+        if self.surfaces is not self.graph.surfaces or (self.segment is not None and self.surfaces.segments[self.segment].kind != kind):
+            self.locate(kind, x, y, width, height)
+
+        x, y, pet.direction, next_state, self.segment = walk_step(
+            state, pet.direction, x, y, width, height, mouse_x, self.surfaces, self.segment, pet.rng)
+        if next_state is not None:
+            pet.set_state(next_state)
+        self.on_ceiling = pet.current_state in CEILING_STATES
+        return x, y
@@ -1,10 +1,18 @@
 import os
 import sys
 import math
+import json
+import time
+import random
+import itertools
+from collections import OrderedDict, namedtuple
+import numpy as np
 from PIL import Image, ImageSequence
-from PyQt6.QtGui import QImage, QPixmap, QColor, QTransform, QPainter
-from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtGui import QImage, QPixmap, QColor, QTransform, QPainter, QFont, QFontMetrics, QPolygonF
+from PyQt6.QtCore import Qt, QUrl, QPointF
 from PyQt6.QtMultimedia import QSoundEffect
+from event_log import events
+from png_bands import open_sheet
 
 def resource_path(relative_path):
     try:
@@ -14,14 +22,35 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+_access_clock = itertools.count(1)
+
+# A decoded sheet is only worth keeping while frames are still being cut from it
+SHEET_IDLE_SECONDS = 5
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
 class SpriteLoader:
+    animated = False
+
     def __init__(self, path, cols, rows):
         self.path = resource_path(path)
         self.cols = cols
         self.rows = rows
+        self.sheet = None
         self.sprites = []
+        self.last_used = []
         self.sprite_width = 0
         self.sprite_height = 0
+        self.target_width = 0
+        self.target_height = 0
+        self.sheet_decodes = 0
+        self.band_decodes = 0
+        self.sheet_used = 0
+        self.created = time.monotonic()
+        self.evicted = set()
+        # An estimate of the most memory held while cutting a frame: sheet, transient copies and resident pixmaps
+        self.peak_load_estimate = 0
         self.load_sprites()
 
     def load_sprites(self):
@@ -29,8 +58,9 @@ class SpriteLoader:
             print(f"Error: Sprite sheet not found at {self.path}")
             return
 
-        img = Image.open(self.path).convert("RGBA")
-        sheet_width, sheet_height = img.size
+        # Only the header is read here; pixels are decoded when a tile is first cut
+        with Image.open(self.path) as img:
+            sheet_width, sheet_height = img.size
         
         self.sprite_width = sheet_width / self.cols
         self.sprite_height = sheet_height / self.rows
@@ -45,22 +75,319 @@ class SpriteLoader:
         if fixed_target_height % 2 != 0:
             fixed_target_height -= 1
 
-        for row in range(self.rows):
-            for col in range(self.cols):
-                left = int(col * self.sprite_width)
-                top = int(row * self.sprite_height)
-                right = int((col + 1) * self.sprite_width)
-                bottom = int((row + 1) * self.sprite_height)
-                
-                sprite_img = img.crop((left, top, right, bottom))
-                
-                data = sprite_img.tobytes("raw", "RGBA")
-                qim = QImage(data, sprite_img.width, sprite_img.height, QImage.Format.Format_RGBA8888)
-                pixmap = QPixmap.fromImage(qim)
-                
-                pixmap = pixmap.scaled(fixed_target_width, fixed_target_height, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                
-                self.sprites.append(pixmap)
+        self.target_width = fixed_target_width
+        self.target_height = fixed_target_height
+
+        # Tiles are only turned into pixmaps the first time they are needed
+        self.sprites = [None] * (self.cols * self.rows)
+        self.last_used = [0] * (self.cols * self.rows)
+
+    def get_sheet(self):
+        if self.sheet is None:
+            # PNG sheets stream one band of rows at a time; the full sheet is never decoded at once
+            self.sheet = open_sheet(self.path)
+            self.sheet_decodes += 1
+        self.sheet_used = time.monotonic()
+        return self.sheet
+
+    def release_sheet(self):
+        if self.sheet is not None:
+            self.sheet.close()
+            self.sheet = None
+
+    def release_idle_sheet(self, idle_seconds=SHEET_IDLE_SECONDS):
+        if self.sheet is not None and time.monotonic() - self.sheet_used > idle_seconds:
+            self.release_sheet()
+            return True
+        return False
+
+    def sheet_bytes(self):
+        if self.sheet is None:
+            return 0
+        return self.sheet.held_bytes()
+
+    def get_sprite(self, index):
+        pixmap = self.sprites[index]
+        if pixmap is None:
+            pixmap = self.materialize(index)
+            self.evicted.discard(index)
+        self.last_used[index] = next(_access_clock)
+        return pixmap
+
+    def materialize(self, index):
+        sheet = self.get_sheet()
+        row, col = divmod(index, self.cols)
+        left = int(col * self.sprite_width)
+        top = int(row * self.sprite_height)
+        right = int((col + 1) * self.sprite_width)
+        bottom = int((row + 1) * self.sprite_height)
+        
+        # Convert per tile so a non-RGBA sheet never gets a full RGBA copy
+        decodes = sheet.band_decodes
+        sprite_img = sheet.crop((left, top, right, bottom))
+        self.band_decodes += sheet.band_decodes - decodes
+        if sprite_img.mode != "RGBA":
+            sprite_img = sprite_img.convert("RGBA")
+        
+        data = sprite_img.tobytes("raw", "RGBA")
+        qim = QImage(data, sprite_img.width, sprite_img.height, QImage.Format.Format_RGBA8888)
+        pixmap = QPixmap.fromImage(qim)
+        
+        pixmap = pixmap.scaled(self.target_width, self.target_height, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        
+        tile_bytes = len(data) * 3
+        self.peak_load_estimate = max(self.peak_load_estimate, sheet.peak_bytes + tile_bytes + self.pixmap_bytes())
+        
+        self.sprites[index] = pixmap
+        self.last_used[index] = next(_access_clock)
+        return pixmap
+
+    def evict(self, index):
+        pixmap = self.sprites[index]
+        if pixmap is None:
+            return 0
+        self.sprites[index] = None
+        self.evicted.add(index)
+        return pixmap_bytes(pixmap)
+
+    def is_resident(self, index):
+        return self.sprites[index] is not None
+
+    def wants_prefetch(self, index):
+        # Frames the memory budget pushed out come back when shown, not ahead of time
+        return index < len(self.sprites) and self.sprites[index] is None and index not in self.evicted
+
+    def prefetch(self, indices, limit=None):
+        loaded = 0
+        for index in indices:
+            if limit is not None and loaded >= limit:
+                break
+            if self.wants_prefetch(index):
+                self.materialize(index)
+                loaded += 1
+        if not loaded:
+            self.release_idle_sheet()
+        return loaded
+
+    def resident_count(self):
+        return sum(1 for pixmap in self.sprites if pixmap is not None)
+
+    def pixmap_bytes(self):
+        return sum(pixmap_bytes(pixmap) for pixmap in self.sprites if pixmap is not None)
+
+FRAME_WIDTH = 112
+FRAME_HEIGHT = 96
+
+class AnimationLoader(SpriteLoader):
+    # Animated GIF/APNG styles: one sprite per file frame, decoded in order from
+    # an open file. PIL composites each frame over the last using its disposal
+    # and blend settings, so frames must be read through seek rather than cut.
+    animated = True
+
+    def __init__(self, path):
+        self.sequence = None
+        self.frame_duration = 100
+        super().__init__(path, 1, 1)
+
+    def load_sprites(self):
+        if not os.path.exists(self.path):
+            print(f"Error: Animation not found at {self.path}")
+            return
+
+        # Frame count comes from the header (APNG) or a skim of the blocks (GIF); nothing is decoded
+        with Image.open(self.path) as img:
+            width, height = img.size
+            frame_count = getattr(img, 'n_frames', 1)
+            self.frame_duration = img.info.get('duration') or 100
+
+        self.sprite_width = width
+        self.sprite_height = height
+        print(f"Animation: {width}x{height}, {frame_count} frames")
+
+        self.target_width = FRAME_WIDTH
+        self.target_height = FRAME_HEIGHT
+        self.sprites = [None] * frame_count
+        self.last_used = [0] * frame_count
+
+    def get_sheet(self):
+        if self.sheet is None:
+            self.sheet = Image.open(self.path)
+            # APNG can only step forward from a frame that has been read
+            self.sheet.load()
+            self.sequence = ImageSequence.Iterator(self.sheet)
+            self.sheet_decodes += 1
+        self.sheet_used = time.monotonic()
+        return self.sheet
+
+    def release_sheet(self):
+        super().release_sheet()
+        self.sequence = None
+
+    def sheet_bytes(self):
+        if self.sheet is None:
+            return 0
+        # Only the current composited frame is held, never the whole file
+        return self.sheet.width * self.sheet.height * 4
+
+    def materialize(self, index):
+        if self.sheet is not None and index < self.sheet.tell():
+            # Frames only decode forwards; going back reopens the file and replays from the first
+            self.release_sheet()
+        self.get_sheet()
+        frame = self.sequence[index].convert("RGBA")
+
+        scale = min(self.target_width / frame.width, self.target_height / frame.height)
+        size = (max(1, round(frame.width * scale)), max(1, round(frame.height * scale)))
+        # A cheap box reduction first keeps big community frames from dominating load time
+        factor = int(1 / scale) // 2
+        if factor > 1:
+            frame = frame.reduce(factor)
+        frame = frame.resize(size, Image.Resampling.LANCZOS)
+
+        # Fit inside the sheet frame size, standing on its bottom edge like sheet sprites
+        canvas = Image.new("RGBA", (self.target_width, self.target_height), (0, 0, 0, 0))
+        canvas.paste(frame, ((self.target_width - size[0]) // 2, self.target_height - size[1]))
+
+        data = canvas.tobytes("raw", "RGBA")
+        qim = QImage(data, canvas.width, canvas.height, QImage.Format.Format_RGBA8888)
+        pixmap = QPixmap.fromImage(qim)
+
+        self.peak_load_estimate = max(self.peak_load_estimate, self.sheet_bytes() * 2 + len(data) * 2 + self.pixmap_bytes())
+
+        self.sprites[index] = pixmap
+        self.last_used[index] = next(_access_clock)
+        return pixmap
+
+def is_animation(path):
+    try:
+        with Image.open(path) as img:
+            return getattr(img, 'is_animated', False)
+    except OSError:
+        return False
+
+_loader_cache = {}
+
+def get_sprite_loader(path, cols=10, rows=10):
+    # Pets showing the same style share one loader and its frames
+    key = (resource_path(path), cols, rows)
+    loader = _loader_cache.get(key)
+    if loader is None:
+        if is_animation(key[0]):
+            loader = AnimationLoader(path)
+        else:
+            loader = SpriteLoader(path, cols, rows)
+        _loader_cache[key] = loader
+    return loader
+
+_tint_cache = {}
+
+def get_tint_cache(loader):
+    # Tinted variants depend only on the frames, so pets sharing a loader share them too
+    tints = _tint_cache.get(loader)
+    if tints is None:
+        tints = _tint_cache.setdefault(loader, TintCache(loader))
+    return tints
+
+def shared_loaders():
+    return list(_loader_cache.values())
+
+def shared_tint_caches():
+    return list(_tint_cache.values())
+
+def drop_sprite_loader(loader):
+    for key, cached in list(_loader_cache.items()):
+        if cached is loader:
+            del _loader_cache[key]
+    _tint_cache.pop(loader, None)
+    loader.release_sheet()
+
+def drop_unused_loaders(pets):
+    # Frames of a style nobody shows any more are dead weight, budget or not
+    active = {id(pet.loader) for pet in pets}
+    dropped = 0
+    for loader in shared_loaders():
+        # A threaded pet switching styles creates its loader a moment before it holds it
+        if id(loader) not in active and time.monotonic() - loader.created > 1:
+            drop_sprite_loader(loader)
+            dropped += 1
+    return dropped
+
+def pixmap_to_array(pixmap):
+    image = pixmap.toImage().convertToFormat(QImage.Format.Format_RGBA8888)
+    width, height = image.width(), image.height()
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    rows = np.frombuffer(bits, np.uint8).reshape(height, image.bytesPerLine())
+    return rows[:, :width * 4].reshape(height, width, 4).copy()
+
+def array_to_pixmap(pixels):
+    height, width = pixels.shape[:2]
+    data = np.ascontiguousarray(pixels).tobytes()
+    qim = QImage(data, width, height, width * 4, QImage.Format.Format_RGBA8888)
+    return QPixmap.fromImage(qim)
+
+class TintCache:
+    DISCO_STEPS = 12
+    PULSE_STEPS = 8
+    DISCO_ALPHA = 100 / 255.0
+    PULSE_GLOW = 0.6
+
+    def __init__(self, loader, max_entries=96):
+        self.loader = loader
+        self.max_entries = max(max_entries, self.DISCO_STEPS, self.PULSE_STEPS)
+        self.variants = OrderedDict()
+        self.generated = 0
+        self.evicted = 0
+
+    def get(self, index, effect, step):
+        key = (index, effect, step)
+        pixmap = self.variants.get(key)
+        if pixmap is None:
+            # A miss builds every step of the effect for this frame in one pass
+            for variant_step, variant in enumerate(self.build(index, effect)):
+                self.store((index, effect, variant_step), variant)
+            pixmap = self.variants[key]
+        self.variants.move_to_end(key)
+        return pixmap
+
+    def store(self, key, pixmap):
+        self.variants[key] = pixmap
+        self.variants.move_to_end(key)
+        self.generated += 1
+        while len(self.variants) > self.max_entries:
+            self.variants.popitem(last=False)
+            self.evicted += 1
+
+    def build(self, index, effect):
+        pixels = pixmap_to_array(self.loader.get_sprite(index))
+        rgb = pixels[..., :3].astype(np.float32)
+
+        if effect == 'disco':
+            # Same result as a SourceAtop fill of a fully saturated hue
+            hues = np.arange(self.DISCO_STEPS, dtype=np.float32) / self.DISCO_STEPS
+            colors = np.stack([
+                np.clip(np.abs(hues * 6 - 3) - 1, 0, 1),
+                np.clip(2 - np.abs(hues * 6 - 2), 0, 1),
+                np.clip(2 - np.abs(hues * 6 - 4), 0, 1),
+            ], axis=1) * 255
+            tinted = rgb[None] * (1 - self.DISCO_ALPHA) + colors[:, None, None, :] * self.DISCO_ALPHA
+        elif effect == 'pulse':
+            phases = np.arange(self.PULSE_STEPS, dtype=np.float32) / self.PULSE_STEPS
+            levels = (0.5 - 0.5 * np.cos(phases * 2 * math.pi)) * self.PULSE_GLOW
+            tinted = rgb[None] + (255 - rgb[None]) * levels[:, None, None, None]
+        else:
+            raise ValueError(f"Unknown tint effect: {effect}")
+
+        variants = np.empty((len(tinted),) + pixels.shape, np.uint8)
+        variants[..., :3] = np.clip(tinted + 0.5, 0, 255)
+        variants[..., 3] = pixels[..., 3]
+        return [array_to_pixmap(variant) for variant in variants]
+
+    def clear(self):
+        self.variants.clear()
+
+    def pixmap_bytes(self):
+        return sum(pixmap_bytes(pixmap) for pixmap in self.variants.values())
 
 class PetState:
     IDLE = 0
@@ -91,15 +418,370 @@ class PetState:
     DRAG = 25
     PRE_CHASE = 26
 
+STATE_NAMES = {value: name for name, value in vars(PetState).items() if name.isupper()}
+
 class PetMood:
     HAPPY = 0
     SLEEPY = 1
     HYPER = 2
     GRUMPY = 3
 
+# Idle behavior picks, checked in order: the first entry whose threshold is
+# above the roll wins. Entries with two states pick one of them 50/50.
+BEHAVIOR_TABLES = {
+    PetMood.HAPPY: [
+        (0.40, (PetState.MOVE_RIGHT, PetState.MOVE_LEFT)),
+        (0.50, (PetState.LOOK_SEQUENCE,)),
+        (0.60, (PetState.SPEAK,)),
+        (0.70, (PetState.INQUISITIVE,)),
+        (0.75, (PetState.SLEEP,)),
+        (0.80, (PetState.SPIN,)),
+        (0.85, (PetState.JUMP,)),
+        (0.92, (PetState.SHAKE,)),
+        (0.94, (PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT)),
+        (1.0, (PetState.ZOOMIES,)),
+    ],
+    PetMood.SLEEPY: [
+        (0.50, (PetState.MOVE_RIGHT, PetState.MOVE_LEFT)),
+        (0.60, (PetState.LOOK_SEQUENCE,)),
+        (0.65, (PetState.SPEAK,)),
+        (0.70, (PetState.INQUISITIVE,)),
+        (0.40, (PetState.SLEEP,)),
+        (0.75, (PetState.SPIN,)),
+        (0.80, (PetState.JUMP,)),
+        (0.90, (PetState.SHAKE,)),
+        (0.95, (PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT)),
+        (1.0, (PetState.ZOOMIES,)),
+    ],
+    PetMood.HYPER: [
+        (0.20, (PetState.MOVE_RIGHT, PetState.MOVE_LEFT)),
+        (0.30, (PetState.SPIN,)),
+        (0.45, (PetState.JUMP,)),
+        (0.60, (PetState.ZOOMIES,)),
+        (0.70, (PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT)),
+        (0.80, (PetState.SHAKE,)),
+        (0.85, (PetState.LOOK_SEQUENCE,)),
+        (0.90, (PetState.SPEAK,)),
+        (0.95, (PetState.INQUISITIVE,)),
+        (1.0, (PetState.DISCO,)),
+    ],
+    PetMood.GRUMPY: [
+        (0.60, (PetState.MOVE_RIGHT, PetState.MOVE_LEFT)),
+        (0.50, (PetState.LOOK_SEQUENCE,)),
+        (0.70, (PetState.SPEAK,)),
+        (0.80, (PetState.INQUISITIVE,)),
+        (0.90, (PetState.SLEEP,)),
+        (0.95, (PetState.SPIN,)),
+        (0.98, (PetState.JUMP,)),
+        (0.30, (PetState.SHAKE,)),
+        (1.0, (PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT)),
+    ],
+}
+
+def choose_behavior(mood, r, rng):
+    for threshold, choices in BEHAVIOR_TABLES[mood]:
+        if r < threshold:
+            if len(choices) == 2:
+                if rng.random() < 0.5:
+                    return choices[0]
+                return choices[1]
+            return choices[0]
+    return PetState.IDLE
+
+def behavior_weights(mood):
+    # Effective probability of each pick once shadowed entries are accounted for
+    weights = {}
+    reached = 0.0
+    for threshold, choices in BEHAVIOR_TABLES[mood]:
+        share = max(0.0, threshold - reached)
+        reached = max(reached, threshold)
+        for state in choices:
+            weights[state] = weights.get(state, 0.0) + share / len(choices)
+    return weights
+
+def load_style_manifest(sprite_path):
+    manifest_path = os.path.splitext(resource_path(sprite_path))[0] + '.json'
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read style manifest {manifest_path}: {e}")
+        return {}
+
+def manifest_grid(manifest):
+    cols = manifest.get('cols', 10)
+    rows = manifest.get('rows', 10)
+    if not all(isinstance(value, int) and not isinstance(value, bool) and value > 0 for value in (cols, rows)):
+        print(f"Error: Bad sheet grid in style manifest: cols={cols!r} rows={rows!r}")
+        return 10, 10
+    return cols, rows
+
+def animation_error(anim, frame_count):
+    frames = anim.get('frames')
+    if not isinstance(frames, (list, tuple, range)) or len(frames) == 0:
+        return f"frames must be a non-empty list, not {frames!r}"
+    for index in frames:
+        if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < frame_count:
+            return f"frame {index!r} is not between 0 and {frame_count - 1}"
+    interval = anim.get('interval')
+    if not isinstance(interval, (int, float)) or isinstance(interval, bool) or not interval > 0:
+        return f"interval must be a positive number of milliseconds, not {interval!r}"
+    if not isinstance(anim.get('loop'), bool):
+        return f"loop must be true or false, not {anim.get('loop')!r}"
+    return None
+
+def apply_manifest(animations, manifest, frame_count=None):
+    # frame_count bounds the frames an override may use: the sheet's cells, or an animation's file frames
+    if frame_count is None:
+        cols, rows = manifest_grid(manifest)
+        frame_count = cols * rows
+    for state_name, override in manifest.get('animations', {}).items():
+        state = getattr(PetState, state_name, None)
+        if not isinstance(state, int):
+            print(f"Error: Unknown state in style manifest: {state_name}")
+            continue
+        if not isinstance(override, dict):
+            print(f"Error: Style manifest entry for {state_name} is not an object")
+            continue
+        anim = dict(animations.get(state, {'loop': True, 'interval': 100}))
+        anim.update(override)
+        if 'range' in anim:
+            bounds = anim.pop('range')
+            if (not isinstance(bounds, (list, tuple)) or len(bounds) != 2
+                    or not all(isinstance(bound, int) for bound in bounds) or not 0 <= bounds[0] <= bounds[1]):
+                print(f"Error: Bad frame range for {state_name} in style manifest: {bounds!r}")
+                continue
+            anim['frames'] = range(bounds[0], bounds[1] + 1)
+        if 'next' in anim:
+            next_state = anim['next']
+            if isinstance(next_state, str):
+                next_state = getattr(PetState, next_state, None)
+            if not isinstance(next_state, int) or next_state not in STATE_NAMES:
+                print(f"Error: Unknown next state for {state_name} in style manifest: {anim['next']!r}")
+                continue
+            anim['next'] = next_state
+        error = animation_error(anim, frame_count)
+        if error:
+            print(f"Error: Bad animation for {state_name} in style manifest: {error}")
+            continue
+        animations[state] = anim
+
+def build_animations(manifest=None, frame_count=None):
+    animations = {
+        PetState.IDLE: {'frames': [10], 'loop': True, 'interval': 1000}, 
+        PetState.IDLE_WINK: {'frames': range(0, 10), 'loop': False, 'next': PetState.IDLE, 'interval': 150},
+        PetState.LOOK_SEQUENCE: {'frames': range(10, 20), 'loop': False, 'next': PetState.IDLE, 'interval': 200},
+        PetState.SPEAK: {'frames': range(20, 30), 'loop': False, 'next': PetState.IDLE, 'interval': 150},
+        PetState.MOVE_RIGHT: {'frames': range(30, 40), 'loop': True, 'interval': 100},
+        PetState.MOVE_LEFT: {'frames': range(40, 50), 'loop': True, 'interval': 100},
+        PetState.SLEEP: {'frames': range(50, 60), 'loop': True, 'interval': 300},
+        PetState.FLAP: {'frames': range(60, 70), 'loop': False, 'next': PetState.IDLE, 'interval': 100},
+        PetState.PUFF: {'frames': list(range(70, 80)) + list(range(78, 69, -1)) + [10], 'loop': False, 'next': PetState.IDLE, 'interval': 150},
+        PetState.FLAP_HARD: {'frames': range(80, 90), 'loop': False, 'next': PetState.IDLE, 'interval': 100},
+        PetState.INQUISITIVE: {'frames': range(90, 99), 'loop': False, 'next': PetState.IDLE, 'interval': 200},
+        PetState.SPIN: {'frames': [10], 'loop': False, 'next': PetState.IDLE, 'interval': 50}, 
+        PetState.JUMP: {'frames': [10], 'loop': False, 'next': PetState.IDLE, 'interval': 50},
+        PetState.SHAKE: {'frames': [10], 'loop': False, 'next': PetState.IDLE, 'interval': 50},
+        PetState.MOONWALK_RIGHT: {'frames': range(40, 50), 'loop': True, 'interval': 100}, 
+        PetState.MOONWALK_LEFT: {'frames': range(30, 40), 'loop': True, 'interval': 100}, 
+        PetState.ZOOMIES: {'frames': range(30, 40), 'loop': True, 'interval': 50}, 
+        PetState.GHOST: {'frames': [10], 'loop': True, 'interval': 1000}, 
+        PetState.CHASE: {'frames': range(30, 40), 'loop': True, 'interval': 80}, 
+        PetState.DISCO: {'frames': [10] * 30, 'loop': False, 'next': PetState.IDLE, 'interval': 100}, 
+        PetState.PULSE: {'frames': [10] * 20, 'loop': False, 'next': PetState.IDLE, 'interval': 100}, 
+        PetState.SPAWN: {'frames': [10], 'loop': True, 'interval': 100}, 
+        PetState.DRAG: {'frames': range(60, 70), 'loop': True, 'interval': 100}, 
+        PetState.PRE_CHASE: {'frames': range(90, 99), 'loop': False, 'next': PetState.CHASE, 'interval': 200},
+        PetState.CEILING_WALK_RIGHT: {'frames': range(30, 40), 'loop': True, 'interval': 100},
+        PetState.CEILING_WALK_LEFT: {'frames': range(40, 50), 'loop': True, 'interval': 100},
+    }
+
+    if manifest:
+        apply_manifest(animations, manifest, frame_count)
+    return animations
+
+def fit_animations(animations, frame_count, manifest, frame_duration=100):
+    # The default table indexes a 10x10 sheet. For an animation, states the manifest
+    # does not map play the idle frames for the same number of steps, so every
+    # state keeps its usual timing. Mapped states without an interval play at the
+    # file's own frame rate.
+    overrides = manifest.get('animations', {})
+    mapped = {getattr(PetState, name, None) for name in overrides}
+    timed = {getattr(PetState, name, None) for name, override in overrides.items()
+             if isinstance(override, dict) and 'interval' in override}
+    idle = [index for index in animations[PetState.IDLE]['frames'] if index < frame_count] if PetState.IDLE in mapped else []
+    idle = idle or [0]
+    for state, anim in animations.items():
+        frames = list(anim['frames'])
+        if state not in mapped:
+            anim['frames'] = [idle[step % len(idle)] for step in range(len(frames))]
+            continue
+        if state not in timed:
+            anim['interval'] = frame_duration
+        if any(index >= frame_count for index in frames):
+            print(f"Error: Style manifest maps frames past the end of the animation ({frame_count} frames)")
+            anim['frames'] = [min(index, frame_count - 1) for index in frames]
+
+SOUNDS = ["chirp", "peep", "tik", "mew", "kwee", "pip", "bip", "bop", "mrrp", "yip"]
+
+MOOD_CHOICES = [PetMood.HAPPY, PetMood.SLEEPY, PetMood.HYPER, PetMood.GRUMPY]
+MOOD_WEIGHTS = [0.4, 0.2, 0.2, 0.2]
+MOOD_ENTRY_STATES = {
+    PetMood.SLEEPY: PetState.SLEEP,
+    PetMood.HYPER: PetState.ZOOMIES,
+    PetMood.GRUMPY: PetState.SHAKE,
+}
+
+def random_mood(rng):
+    mood = rng.choices(MOOD_CHOICES, weights=MOOD_WEIGHTS)[0]
+    return mood, rng.randint(20000, 60000)
+
+def random_sentence(rng, name, sounds):
+    num_words = rng.randint(1, 4)
+    sentence_words = []
+    
+    for _ in range(num_words):
+        if rng.random() < 0.2: # 20% chance to say name
+            sentence_words.append(name)
+        else:
+            sentence_words.append(rng.choice(sounds))
+            
+    sentence = " ".join(sentence_words)
+    
+    sentence = sentence.capitalize()
+    
+    punctuation = rng.choice(["!", ".", "?", "!!"])
+    sentence += punctuation
+    return sentence
+
+FRONT_FACING_STATES = frozenset([
+    PetState.IDLE, PetState.IDLE_WINK, 
+    PetState.SPEAK, PetState.SLEEP, 
+    PetState.SPAWN, PetState.LOOK_SEQUENCE,
+    PetState.FLAP, PetState.PUFF,
+    PetState.FLAP_HARD, PetState.INQUISITIVE,
+    PetState.SPIN, PetState.JUMP,
+    PetState.SHAKE, PetState.GHOST,
+    PetState.DRAG, PetState.DISCO, PetState.PULSE,
+    PetState.MOVE_LEFT, PetState.MOONWALK_RIGHT,
+    PetState.CEILING_WALK_LEFT
+])
+
+UPSIDE_DOWN_STATES = frozenset([PetState.CEILING_WALK_LEFT, PetState.CEILING_WALK_RIGHT])
+
+# Everything needed to draw one frame, without the pixmap, so it can be recorded or sent to another process
+RenderFrame = namedtuple('RenderFrame', [
+    'state', 'sprite_index', 'offset_x', 'offset_y', 'scale_x', 'scale_y',
+    'rotation', 'color_tint', 'direction', 'speech_text',
+])
+
+SPRITE_BASE_X = 44
+SPRITE_BASE_Y = 104
+CANVAS_HEIGHT = 200
+
+def frame_pixmap(loader, tints, frame):
+    if frame.color_tint:
+        return tints.get(frame.sprite_index, *frame.color_tint)
+    return loader.get_sprite(frame.sprite_index)
+
+def paint_pet(painter, frame, pixmap):
+    # Shared by PetWindow.paintEvent and the exporter; returns where the speech bubble
+    # attaches and whether it hangs below the pet instead of floating above it
+    draw_x = SPRITE_BASE_X + frame.offset_x
+    draw_y = SPRITE_BASE_Y + frame.offset_y
+    
+    anchor_x = 56
+    anchor_y = 96
+    
+    if frame.state in [PetState.SPIN, PetState.DRAG]:
+        anchor_x = 56
+        anchor_y = 48
+    
+    upside_down = frame.state in UPSIDE_DOWN_STATES
+    
+    painter.save()
+    if upside_down:
+        # Ceiling walks mirror the whole window, so the feet touch its top edge
+        painter.translate(0, CANVAS_HEIGHT)
+        painter.scale(1, -1)
+    painter.translate(draw_x + anchor_x, draw_y + anchor_y)
+    
+    if frame.direction == -1 and frame.state not in FRONT_FACING_STATES:
+        painter.scale(-1, 1)
+    
+    if frame.rotation != 0:
+        painter.rotate(frame.rotation)
+        
+    if frame.scale_x != 1.0 or frame.scale_y != 1.0:
+        painter.scale(frame.scale_x, frame.scale_y)
+        
+    painter.drawPixmap(-anchor_x, -anchor_y, pixmap)
+        
+    painter.restore()
+    if upside_down:
+        return draw_x + anchor_x, CANVAS_HEIGHT - draw_y, True
+    return draw_x + anchor_x, draw_y, False
+
+class SpeechBubble:
+    PADDING = 10
+
+    def __init__(self):
+        self.font = QFont("Arial", 10)
+        self.metrics = QFontMetrics(self.font)
+        self.text = None
+        self.path = None
+        self.width = 0
+        self.height = 0
+
+    def build(self, text):
+        # The bubble outline only changes with the text, so it is built once per phrase
+        padding = self.PADDING
+        bubble_w = self.metrics.horizontalAdvance(text) + padding * 2
+        bubble_h = self.metrics.height() + padding * 2
+        
+        path = QPolygonF()
+        path.append(QPointF(0, 0))
+        path.append(QPointF(bubble_w, 0))
+        path.append(QPointF(bubble_w, bubble_h))
+        path.append(QPointF(bubble_w / 2 + 5, bubble_h))
+        path.append(QPointF(bubble_w / 2, bubble_h + 10))
+        path.append(QPointF(bubble_w / 2 - 5, bubble_h))
+        path.append(QPointF(0, bubble_h))
+        path.append(QPointF(0, 0))
+        self.text = text
+        self.path = path
+        # The same outline with the tail on top, for pets hanging from the ceiling
+        self.hanging_path = QPolygonF([QPointF(point.x(), bubble_h + 10 - point.y()) for point in path])
+        self.width = bubble_w
+        self.height = bubble_h
+
+    def paint(self, painter, text, center_x, edge_y, below=False):
+        if text != self.text:
+            self.build(text)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if below:
+            painter.translate(center_x - self.width / 2, edge_y)
+        else:
+            painter.translate(center_x - self.width / 2, edge_y - self.height - 10)
+        
+        painter.setFont(self.font)
+        painter.setBrush(QColor(255, 255, 255))
+        painter.setPen(QColor(0, 0, 0))
+        painter.drawPolygon(self.hanging_path if below else self.path)
+        
+        text_y = self.PADDING + self.metrics.ascent() + (10 if below else 0)
+        painter.drawText(self.PADDING, int(text_y), text)
+        painter.restore()
+
 class PetSystem:
-    def __init__(self, sprite_path='assets/defaultspritesheet.png', style_name='Default'):
-        self.load_style(sprite_path, style_name)
+    def __init__(self, sprite_path='assets/defaultspritesheet.png', style_name='Default', manifest=None, seed=None):
+        # Seeded pets get their own generator so runs can be replayed exactly
+        self.rng = random.Random(seed) if seed is not None else random
+        self.pet_id = 0
+        self.load_style(sprite_path, style_name, manifest)
         
         self.current_state = PetState.SPAWN
         self.current_frame_index = 0
@@ -117,7 +799,7 @@ class PetSystem:
         self.speech_timer = 0
         self.next_speech_time = 5000 
         
-        self.sounds = ["chirp", "peep", "tik", "mew", "kwee", "pip", "bip", "bop", "mrrp", "yip"]
+        self.sounds = list(SOUNDS)
         
         self.mood = PetMood.HAPPY
         self.mood_timer = 0
@@ -128,43 +810,26 @@ class PetSystem:
         self.hunger_timer = 0
         self.energy_timer = 0
 
-    def load_style(self, sprite_path, style_name='Default'):
-        self.loader = SpriteLoader(sprite_path, 10, 10)
+    def load_style(self, sprite_path, style_name='Default', manifest=None):
+        if manifest is None:
+            manifest = load_style_manifest(sprite_path)
+        started = time.perf_counter()
+        self.style_name = style_name
+        cols, rows = manifest_grid(manifest)
+        self.loader = get_sprite_loader(sprite_path, cols, rows)
+        self.tints = get_tint_cache(self.loader)
         self.chirp_sounds = []
         self.has_chirped = False
         
-        self.animations = {
-            PetState.IDLE: {'frames': [10], 'loop': True, 'interval': 1000}, 
-            PetState.IDLE_WINK: {'frames': range(0, 10), 'loop': False, 'next': PetState.IDLE, 'interval': 150},
-            PetState.LOOK_SEQUENCE: {'frames': range(10, 20), 'loop': False, 'next': PetState.IDLE, 'interval': 200},
-            PetState.SPEAK: {'frames': range(20, 30), 'loop': False, 'next': PetState.IDLE, 'interval': 150},
-            PetState.MOVE_RIGHT: {'frames': range(30, 40), 'loop': True, 'interval': 100},
-            PetState.MOVE_LEFT: {'frames': range(40, 50), 'loop': True, 'interval': 100},
-            PetState.SLEEP: {'frames': range(50, 60), 'loop': True, 'interval': 300},
-            PetState.FLAP: {'frames': range(60, 70), 'loop': False, 'next': PetState.IDLE, 'interval': 100},
-            PetState.PUFF: {'frames': list(range(70, 80)) + list(range(78, 69, -1)) + [10], 'loop': False, 'next': PetState.IDLE, 'interval': 150},
-            PetState.FLAP_HARD: {'frames': range(80, 90), 'loop': False, 'next': PetState.IDLE, 'interval': 100},
-            PetState.INQUISITIVE: {'frames': range(90, 99), 'loop': False, 'next': PetState.IDLE, 'interval': 200},
-            PetState.SPIN: {'frames': [10], 'loop': False, 'next': PetState.IDLE, 'interval': 50}, 
-            PetState.JUMP: {'frames': [10], 'loop': False, 'next': PetState.IDLE, 'interval': 50},
-            PetState.SHAKE: {'frames': [10], 'loop': False, 'next': PetState.IDLE, 'interval': 50},
-            PetState.MOONWALK_RIGHT: {'frames': range(40, 50), 'loop': True, 'interval': 100}, 
-            PetState.MOONWALK_LEFT: {'frames': range(30, 40), 'loop': True, 'interval': 100}, 
-            PetState.ZOOMIES: {'frames': range(30, 40), 'loop': True, 'interval': 50}, 
-            PetState.GHOST: {'frames': [10], 'loop': True, 'interval': 1000}, 
-            PetState.CHASE: {'frames': range(30, 40), 'loop': True, 'interval': 80}, 
-            PetState.DISCO: {'frames': [10], 'loop': True, 'interval': 100}, 
-            PetState.SPAWN: {'frames': [10], 'loop': True, 'interval': 100}, 
-            PetState.DRAG: {'frames': range(60, 70), 'loop': True, 'interval': 100}, 
-            PetState.PRE_CHASE: {'frames': range(90, 99), 'loop': False, 'next': PetState.CHASE, 'interval': 200},
-        }
-        
-        if style_name == 'Melvin':
-            self.animations[PetState.FLAP_HARD] = {'frames': [10], 'loop': False, 'next': PetState.IDLE, 'interval': 100}
-            self.animations[PetState.INQUISITIVE] = {'frames': [10], 'loop': False, 'next': PetState.IDLE, 'interval': 200}
-            self.animations[PetState.PRE_CHASE] = {'frames': [10], 'loop': False, 'next': PetState.CHASE, 'interval': 200}
+        self.animations = build_animations(manifest, len(self.loader.sprites) or None)
+        if self.loader.animated and self.loader.sprites:
+            fit_animations(self.animations, len(self.loader.sprites), manifest, self.loader.frame_duration)
+        self.zoomies_left = False
         
         self.idle_counter = 0
+        self.prefetch_key = None
+        self.prefetch_plan = []
+        events.record('style', self.pet_id, style_name, 'load_ms', round((time.perf_counter() - started) * 1000, 2))
 
     def update(self, dt_ms, mouse_pos=None, window_pos=None):
         anim = self.animations[self.current_state]
@@ -207,13 +872,9 @@ class PetSystem:
         
         elif self.current_state == PetState.ZOOMIES:
             if self.frame_timer % 500 < dt_ms:
-                import random
-                if random.random() < 0.3:
+                if self.rng.random() < 0.3:
                     self.direction *= -1
-                    if self.direction == 1:
-                        self.animations[PetState.ZOOMIES]['frames'] = range(30, 40)
-                    else:
-                        self.animations[PetState.ZOOMIES]['frames'] = range(40, 50)
+                    self.zoomies_left = self.direction != 1
             
             if self.bob_timer > 3000: 
                  self.set_state(PetState.IDLE)
@@ -233,8 +894,7 @@ class PetSystem:
         self.next_speech_time -= dt_ms
         if self.next_speech_time <= 0:
             self.say_random_thing()
-            import random
-            self.next_speech_time = random.randint(30000, 90000)
+            self.next_speech_time = self.rng.randint(30000, 90000)
 
         # Mood updates
         self.mood_timer += dt_ms
@@ -289,23 +949,20 @@ class PetSystem:
                                 self.direction = -1
                                 
                             if dist < 200:
-                                import random
-                                if random.random() < 0.5: 
-                                    if random.random() < 0.5:
+                                if self.rng.random() < 0.5: 
+                                    if self.rng.random() < 0.5:
                                         self.set_state(PetState.JUMP)
                                     else:
                                         self.set_state(PetState.SHAKE)
                                     return
 
                     if self.current_state == PetState.IDLE:
-                        import random
-                        if random.random() < 0.3: 
-                            r = random.random()
+                        if self.rng.random() < 0.3: 
+                            r = self.rng.random()
                             
                     if self.current_state == PetState.IDLE:
-                        import random
-                        if random.random() < 0.3: 
-                            r = random.random()
+                        if self.rng.random() < 0.3: 
+                            r = self.rng.random()
                             
                             if mouse_pos and window_pos:
                                 dx = mouse_pos.x() - window_pos.x()
@@ -314,104 +971,19 @@ class PetSystem:
                                 
                                 if dist < 300:
                                     if self.mood == PetMood.GRUMPY:
-                                        if random.random() < 0.7:
+                                        if self.rng.random() < 0.7:
                                             if dx > 0: self.set_state(PetState.MOVE_LEFT)
                                             else: self.set_state(PetState.MOVE_RIGHT)
                                             return
                                     elif self.mood in [PetMood.HAPPY, PetMood.HYPER]:
-                                        if random.random() < 0.7:
+                                        if self.rng.random() < 0.7:
                                             self.set_state(PetState.PRE_CHASE)
                                             return
 
-                            # Probabilities based on mood
-                            prob_move = 0.40
-                            prob_look = 0.50
-                            prob_speak = 0.60
-                            prob_inquisitive = 0.70
-                            prob_sleep = 0.75
-                            prob_spin = 0.80
-                            prob_jump = 0.85
-                            prob_shake = 0.92
-                            prob_moonwalk = 0.94
-                            
-                            if self.mood == PetMood.SLEEPY:
-                                prob_sleep = 0.40
-                                prob_move = 0.50
-                                prob_look = 0.60
-                                prob_speak = 0.65
-                                prob_inquisitive = 0.70
-                                prob_spin = 0.75
-                                prob_jump = 0.80
-                                prob_shake = 0.90
-                                prob_moonwalk = 0.95
-                            elif self.mood == PetMood.HYPER:
-                                prob_move = 0.20
-                                prob_spin = 0.30
-                                prob_jump = 0.45
-                                prob_zoomies = 0.60
-                                prob_moonwalk = 0.70
-                                prob_shake = 0.80
-                                prob_look = 0.85
-                                prob_speak = 0.90
-                                prob_inquisitive = 0.95
-                                prob_sleep = 1.0 # No sleep
-                            elif self.mood == PetMood.GRUMPY:
-                                prob_shake = 0.30
-                                prob_look = 0.50
-                                prob_move = 0.60
-                                prob_speak = 0.70
-                                prob_inquisitive = 0.80
-                                prob_sleep = 0.90
-                                prob_spin = 0.95
-                                prob_jump = 0.98
-                                prob_moonwalk = 1.0
-                            
-                            if self.mood == PetMood.HYPER:
-                                if r < prob_move:
-                                    if random.random() < 0.5: self.set_state(PetState.MOVE_RIGHT)
-                                    else: self.set_state(PetState.MOVE_LEFT)
-                                elif r < prob_spin: self.set_state(PetState.SPIN)
-                                elif r < prob_jump: self.set_state(PetState.JUMP)
-                                elif r < prob_zoomies: self.set_state(PetState.ZOOMIES)
-                                elif r < prob_moonwalk:
-                                    if random.random() < 0.5: self.set_state(PetState.MOONWALK_RIGHT)
-                                    else: self.set_state(PetState.MOONWALK_LEFT)
-                                elif r < prob_shake: self.set_state(PetState.SHAKE)
-                                elif r < prob_look: self.set_state(PetState.LOOK_SEQUENCE)
-                                elif r < prob_speak: self.set_state(PetState.SPEAK)
-                                elif r < prob_inquisitive: self.set_state(PetState.INQUISITIVE)
-                                else: self.set_state(PetState.IDLE)
-                            else:
-                                if r < prob_move: 
-                                    if random.random() < 0.5:
-                                        self.set_state(PetState.MOVE_RIGHT)
-                                    else:
-                                        self.set_state(PetState.MOVE_LEFT)
-                                elif r < prob_look:
-                                    self.set_state(PetState.LOOK_SEQUENCE)
-                                elif r < prob_speak:
-                                    self.set_state(PetState.SPEAK)
-                                elif r < prob_inquisitive:
-                                    self.set_state(PetState.INQUISITIVE)
-                                elif r < prob_sleep:
-                                    self.set_state(PetState.SLEEP)
-                                elif r < prob_spin:
-                                    self.set_state(PetState.SPIN)
-                                elif r < prob_jump:
-                                    self.set_state(PetState.JUMP)
-                                elif r < prob_shake:
-                                    self.set_state(PetState.SHAKE)
-                                elif r < prob_moonwalk: 
-                                    if random.random() < 0.5:
-                                        self.set_state(PetState.MOONWALK_RIGHT)
-                                    else:
-                                        self.set_state(PetState.MOONWALK_LEFT)
-                                else: 
-                                    self.set_state(PetState.ZOOMIES)
+                            self.set_state(choose_behavior(self.mood, r, self.rng))
                             
                     elif self.current_state in [PetState.MOVE_RIGHT, PetState.MOVE_LEFT, PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT]:
-                         import random
-                         if random.random() < 0.20: 
+                         if self.rng.random() < 0.20: 
                              self.set_state(PetState.IDLE)
 
                 else:
@@ -422,6 +994,7 @@ class PetSystem:
 
     def set_state(self, new_state):
         if self.current_state != new_state:
+            events.record('state', self.pet_id, STATE_NAMES.get(self.current_state), STATE_NAMES.get(new_state))
             self.current_state = new_state
             self.current_frame_index = 0
             self.frame_timer = 0
@@ -431,29 +1004,62 @@ class PetSystem:
             self.offset_y = 0
             self.rotation = 0 
             
-            if new_state == PetState.MOVE_LEFT:
+            if new_state in (PetState.MOVE_LEFT, PetState.CEILING_WALK_LEFT):
                 self.direction = -1
-            elif new_state == PetState.MOVE_RIGHT:
+            elif new_state in (PetState.MOVE_RIGHT, PetState.CEILING_WALK_RIGHT):
                 self.direction = 1
 
+    def plan_prefetch(self):
+        plan = []
+        anim = self.animations[self.current_state]
+        plan.extend(anim['frames'])
+        if 'next' in anim:
+            plan.extend(self.animations[anim['next']]['frames'])
+        if anim['loop']:
+            # Idle loops roll a new behavior, so warm the likeliest picks first
+            weights = behavior_weights(self.mood)
+            for state in sorted(weights, key=weights.get, reverse=True):
+                if weights[state] > 0 and state in self.animations:
+                    plan.extend(self.animations[state]['frames'])
+        plan.extend(self.animations[PetState.IDLE]['frames'])
+
+        ordered = []
+        seen = set()
+        for index in plan:
+            if index not in seen:
+                seen.add(index)
+                ordered.append(index)
+        ordered.reverse()
+        return ordered
+
+    def prefetch_frames(self, limit=1):
+        key = (self.current_state, self.mood)
+        if key != self.prefetch_key:
+            self.prefetch_key = key
+            self.prefetch_plan = self.plan_prefetch()
+
+        loaded = 0
+        plan = self.prefetch_plan
+        while plan and loaded < limit:
+            index = plan.pop()
+            if self.loader.wants_prefetch(index):
+                self.loader.materialize(index)
+                loaded += 1
+        if not plan:
+            self.loader.release_idle_sheet()
+        return loaded
+
     def say_name(self):
         self.speech_text = f"I am {self.name}!"
         self.speech_timer = 3000
         self.set_state(PetState.SPEAK)
 
     def change_mood_randomly(self):
-        import random
-        weights = [0.4, 0.2, 0.2, 0.2] # Happy, Sleepy, Hyper, Grumpy
-        self.mood = random.choices([PetMood.HAPPY, PetMood.SLEEPY, PetMood.HYPER, PetMood.GRUMPY], weights=weights)[0]
+        self.mood, self.mood_duration = random_mood(self.rng)
         self.mood_timer = 0
-        self.mood_duration = random.randint(20000, 60000)
         
-        if self.mood == PetMood.SLEEPY:
-            self.set_state(PetState.SLEEP)
-        elif self.mood == PetMood.HYPER:
-            self.set_state(PetState.ZOOMIES)
-        elif self.mood == PetMood.GRUMPY:
-            self.set_state(PetState.SHAKE)
+        if self.mood in MOOD_ENTRY_STATES:
+            self.set_state(MOOD_ENTRY_STATES[self.mood])
             
     def handle_interaction(self, interaction_type):
         if interaction_type == 'click':
@@ -472,8 +1078,7 @@ class PetSystem:
                         self.mood = PetMood.HAPPY
                         self.set_state(PetState.JUMP)
                 elif self.mood == PetMood.HAPPY:
-                    import random
-                    if random.random() < 0.3:
+                    if self.rng.random() < 0.3:
                         self.mood = PetMood.HYPER
                         self.set_state(PetState.SPIN)
                     else:
@@ -485,39 +1090,26 @@ class PetSystem:
         self.mood = PetMood.HAPPY
         self.speech_text = "Mmm!"
         self.speech_timer = 2000
-        self.set_state(PetState.JUMP)
+        self.set_state(PetState.PULSE)
         self.energy = min(100, self.energy + 20)
 
     def say_random_thing(self):
-        import random
-        
-        num_words = random.randint(1, 4)
-        sentence_words = []
-        
-        for _ in range(num_words):
-            if random.random() < 0.2: # 20% chance to say name
-                sentence_words.append(self.name)
-            else:
-                sentence_words.append(random.choice(self.sounds))
-                
-        sentence = " ".join(sentence_words)
-        
-        sentence = sentence.capitalize()
-        
-        punctuation = random.choice(["!", ".", "?", "!!"])
-        sentence += punctuation
-        
-        self.speech_text = sentence
+        self.speech_text = random_sentence(self.rng, self.name, self.sounds)
         self.speech_timer = 3000
         self.set_state(PetState.SPEAK)
 
-    def get_render_data(self):
-        anim = self.animations[self.current_state]
-        frames = list(anim['frames']) 
+    def animation_frames(self, state):
+        # Zoomies borrow the walk-left frames after turning around instead of rewriting the shared table
+        if state == PetState.ZOOMIES and self.zoomies_left:
+            return self.animations[PetState.MOVE_LEFT]['frames']
+        return self.animations[state]['frames']
+
+    def render_frame(self):
+        frames = self.animation_frames(self.current_state)
         
-        if self.current_frame_index < len(frames):
-            global_index = frames[self.current_frame_index]
-            pixmap = self.loader.sprites[global_index]
+        if self.current_frame_index < len(self.animations[self.current_state]['frames']):
+            # Turned zoomies step through their own length but borrow walk-left frames, which may be fewer
+            global_index = frames[self.current_frame_index % len(frames)]
             
             offset_x = self.offset_x
             offset_y = self.offset_y
@@ -532,18 +1124,36 @@ class PetSystem:
                 cycle = (self.bob_timer % 3000) / 3000.0
                 scale_y = 1.0 + 0.03 * math.sin(cycle * 2 * math.pi)
                 
-            if 60 <= global_index <= 69:
+            if not self.loader.animated and 60 <= global_index <= 69:
                 offset_y += 20
                 
             if self.current_state == PetState.DRAG:
                 rotation = 10 * math.sin(self.bob_timer / 200.0)
                 
+            if self.current_state == PetState.DISCO:
+                step = int((self.bob_timer % 1000) / 1000.0 * TintCache.DISCO_STEPS)
+                color_tint = ('disco', step)
+            elif self.current_state == PetState.PULSE:
+                step = int((self.bob_timer % 800) / 800.0 * TintCache.PULSE_STEPS)
+                color_tint = ('pulse', step)
+                
             if self.current_state == PetState.SPAWN:
                 progress = min(1.0, self.bob_timer / 1000.0)
                 scale = 0.1 + 0.9 * progress
                 scale_x = scale
                 scale_y = scale
                 
-            return (pixmap, offset_x, offset_y, scale_x, scale_y, rotation, color_tint)
+            return RenderFrame(self.current_state, global_index, offset_x, offset_y, scale_x, scale_y,
+                               rotation, color_tint, self.direction, self.speech_text)
             
         return None
+
+    def frame_pixmap(self, frame):
+        return frame_pixmap(self.loader, self.tints, frame)
+
+    def get_render_data(self):
+        frame = self.render_frame()
+        if frame is None:
+            return None
+        return (self.frame_pixmap(frame), frame.offset_x, frame.offset_y, frame.scale_x, frame.scale_y,
+                frame.rotation, frame.color_tint)
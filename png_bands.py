@@ -0,0 +1,192 @@
+import zlib
+import struct
+from bisect import bisect_right
+from PIL import Image
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+READ_BLOCK = 64 * 1024
+INFLATE_STEP = 256 * 1024
+ZLIB_WINDOW = 32 * 1024
+
+# (bit depth, colour type) that PIL's zip decoder reads straight into these modes; anything else is decoded whole
+BAND_MODES = {(8, 2): 'RGB', (8, 6): 'RGBA'}
+
+def read_layout(path):
+    # Returns (width, height, mode, idat) for a PNG that can be streamed, or None
+    with open(path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+        width = height = mode = None
+        idat = []
+        stream_pos = 0
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            length, kind = struct.unpack('>I4s', header)
+            offset = f.tell()
+            if kind == b'IHDR':
+                width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', f.read(13))
+                mode = BAND_MODES.get((depth, color_type))
+                if mode is None or interlace:
+                    return None
+            elif kind == b'tRNS':
+                # A transparent colour key needs PIL's own PNG plugin
+                return None
+            elif kind == b'IDAT':
+                idat.append((stream_pos, offset, length))
+                stream_pos += length
+            elif kind == b'IEND':
+                break
+            f.seek(offset + length + 4)
+    if mode is None or not idat:
+        return None
+    return width, height, mode, idat
+
+class FullSheet:
+    # Fallback for sheets that cannot be streamed: the whole image decoded once
+    def __init__(self, path):
+        self.image = Image.open(path)
+        self.image.load()
+        self.band_decodes = 1
+        self.peak_bytes = self.held_bytes()
+
+    def crop(self, box):
+        return self.image.crop(box)
+
+    def held_bytes(self):
+        return self.image.width * self.image.height * len(self.image.getbands())
+
+    def close(self):
+        self.image.close()
+
+class BandWriter:
+    # Feeds filtered scanlines to PIL's PNG row decoder through a stored (uncompressed)
+    # zlib stream, so neither the raw rows nor a compressed copy is ever held whole
+    def __init__(self, mode, width, height):
+        self.image = Image.new(mode, (width, height))
+        self.decoder = Image._getdecoder(mode, 'zip', (mode,))
+        self.decoder.setimage(self.image.im, (0, 0, width, height))
+        self.compressor = zlib.compressobj(0)
+        self.pending = b''
+        self.done = False
+
+    def write(self, rows):
+        self.feed(self.compressor.compress(rows))
+
+    def feed(self, data):
+        data = self.pending + data
+        while data and not self.done:
+            consumed, error = self.decoder.decode(data)
+            if consumed < 0:
+                self.done = True
+                break
+            if error < 0:
+                raise OSError(f"PNG decoder error {error}")
+            if consumed == 0:
+                break
+            data = data[consumed:]
+        self.pending = data
+
+    def close(self):
+        self.feed(self.compressor.flush())
+        self.decoder.cleanup()
+        return self.image
+
+class PngBands:
+    # Decodes a non-interlaced PNG a band of rows at a time. Rows are filtered
+    # against the row above, so each band is handed to PIL's decoder behind an
+    # unfiltered copy of the row before it. The inflater is checkpointed at
+    # every band edge so any band can be decoded again without replaying the
+    # rows above it.
+    def __init__(self, path, width, height, mode, idat):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.idat = idat
+        self.idat_starts = [start for start, offset, length in idat]
+        self.row_bytes = 1 + width * len(mode)
+        self.checkpoints = {0: (zlib.decompressobj(), 0, None)}
+        self.band = None
+        self.band_decodes = 0
+        self.peak_bytes = 0
+
+    def crop(self, box):
+        left, top, right, bottom = box
+        if self.band is None or not (self.band[0] <= top and bottom <= self.band[1]):
+            self.band = None
+            self.band = self.decode_rows(top, bottom)
+        band_top, band_bottom, skip, image = self.band
+        return image.crop((left, top - band_top + skip, right, bottom - band_top + skip))
+
+    def decode_rows(self, top, bottom):
+        start = max(row for row in self.checkpoints if row <= top)
+        # Rows above the band are only decoded to reach it, never kept
+        while start < top:
+            step = min(bottom - top, top - start)
+            self.decode_band(start, start + step)
+            start += step
+        return self.decode_band(top, bottom)
+
+    def decode_band(self, top, bottom):
+        decompressor, pos, prev_row = self.checkpoints[top]
+        decompressor = decompressor.copy()
+        rows = bottom - top
+        skip = 0 if prev_row is None else 1
+        writer = BandWriter(self.mode, self.width, rows + skip)
+        if prev_row is not None:
+            writer.write(b'\x00' + prev_row)
+        pos = self.inflate(decompressor, pos, rows * self.row_bytes, writer)
+        image = writer.close()
+        self.peak_bytes = max(self.peak_bytes, image.width * image.height * len(self.mode) + INFLATE_STEP * 2 + self.held_bytes())
+
+        last_row = image.crop((0, rows + skip - 1, self.width, rows + skip)).tobytes()
+        self.checkpoints[bottom] = (decompressor, pos, last_row)
+        self.band_decodes += 1
+        return top, bottom, skip, image
+
+    def inflate(self, decompressor, pos, size, writer):
+        got = 0
+        with open(self.path, 'rb') as f:
+            while got < size:
+                block = self.read(f, pos)
+                if decompressor.eof or not block:
+                    raise ValueError(f"PNG image data ends early in {self.path}")
+                chunk = decompressor.decompress(block, min(INFLATE_STEP, size - got))
+                pos += len(block) - len(decompressor.unconsumed_tail)
+                writer.write(chunk)
+                got += len(chunk)
+        return pos
+
+    def read(self, f, pos):
+        index = bisect_right(self.idat_starts, pos) - 1
+        if index < 0:
+            return b''
+        start, offset, length = self.idat[index]
+        if pos >= start + length:
+            return b''
+        f.seek(offset + pos - start)
+        return f.read(min(READ_BLOCK, start + length - pos))
+
+    def held_bytes(self):
+        total = 0
+        if self.band is not None:
+            image = self.band[3]
+            total += image.width * image.height * len(self.mode)
+        for decompressor, pos, prev_row in self.checkpoints.values():
+            total += ZLIB_WINDOW + (len(prev_row) if prev_row else 0)
+        return total
+
+    def close(self):
+        self.band = None
+        self.checkpoints = {}
+
+def open_sheet(path):
+    try:
+        layout = read_layout(path)
+    except (OSError, struct.error):
+        layout = None
+    if layout is None:
+        return FullSheet(path)
+    return PngBands(path, *layout)
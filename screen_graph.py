@@ -0,0 +1,137 @@
+from bisect import bisect_right
+from collections import namedtuple
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+FLOOR = 'floor'
+CEILING = 'ceiling'
+
+# Screens this close count as touching; some setups leave a pixel between them
+SNAP = 2
+
+# prev/next are the segments reached by walking off the left/right end, or None for a dead end
+Segment = namedtuple('Segment', ['kind', 'y', 'left', 'right', 'prev', 'next'])
+
+def merge_edges(edges):
+    # edges: (y, left, right, screen) on one kind of surface; joins runs that share a line
+    merged = []
+    for y, left, right, screen in sorted(edges):
+        last = merged[-1] if merged else None
+        if last and last[0] == y and left <= last[2] + 1 + SNAP:
+            if right > last[2]:
+                last[2] = right
+                last[4] = screen
+        else:
+            merged.append([y, left, right, screen, screen])
+    return merged
+
+def overlaps_vertically(a, b):
+    return a[1] <= b[3] and b[1] <= a[3]
+
+def build_segments(rects):
+    # rects: (left, top, right, bottom) of each screen's available area, inclusive like QRect
+    segments = []
+    for kind, edge in ((FLOOR, 3), (CEILING, 1)):
+        runs = merge_edges([(rect[edge], rect[0], rect[2], index) for index, rect in enumerate(rects)])
+        base = len(segments)
+        links = []
+        for y, left, right, first, last in runs:
+            prev_link = next_link = None
+            prev_gap = next_gap = None
+            for other, (other_y, other_left, other_right, other_first, other_last) in enumerate(runs):
+                if other_y == y:
+                    continue
+                # A shared vertical edge between the end screens; the closest surface wins
+                if abs(other_left - (right + 1)) <= SNAP and overlaps_vertically(rects[last], rects[other_first]):
+                    if next_gap is None or abs(other_y - y) < next_gap:
+                        next_link, next_gap = base + other, abs(other_y - y)
+                if abs(left - (other_right + 1)) <= SNAP and overlaps_vertically(rects[first], rects[other_last]):
+                    if prev_gap is None or abs(other_y - y) < prev_gap:
+                        prev_link, prev_gap = base + other, abs(other_y - y)
+            links.append((prev_link, next_link))
+        for (y, left, right, first, last), (prev_link, next_link) in zip(runs, links):
+            segments.append(Segment(kind, y, left, right, prev_link, next_link))
+    return segments
+
+class Surfaces:
+    # Immutable once built; a rebuild swaps in a new instance so other threads never see a half-built graph
+    def __init__(self, rects):
+        self.rects = tuple(rects)
+        self.segments = tuple(build_segments(rects))
+        self.by_kind = {}
+        for kind in (FLOOR, CEILING):
+            indices = sorted((index for index, segment in enumerate(self.segments) if segment.kind == kind),
+                             key=lambda index: self.segments[index].left)
+            self.by_kind[kind] = (indices, [self.segments[index].left for index in indices])
+
+    def locate(self, kind, x, y):
+        # The surface under x nearest to y, preferring floors below and ceilings above
+        indices, lefts = self.by_kind[kind]
+        best = None
+        best_key = None
+        for index in indices[:bisect_right(lefts, x)]:
+            segment = self.segments[index]
+            if segment.right < x:
+                continue
+            behind = segment.y < y if kind == FLOOR else segment.y > y
+            key = (behind, abs(segment.y - y))
+            if best_key is None or key < best_key:
+                best, best_key = index, key
+        if best is None:
+            # Off every screen (dragged past the outer edge or into a gap): take the closest surface of this kind
+            for index in indices:
+                segment = self.segments[index]
+                gap = max(segment.left - x, x - segment.right, 0)
+                key = (gap, abs(segment.y - y))
+                if best_key is None or key < best_key:
+                    best, best_key = index, key
+        return best
+
+class ScreenGraph(QObject):
+    changed = pyqtSignal()
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.surfaces = Surfaces([])
+        self.rebuilds = 0
+        self.watched = set()
+        app.screenAdded.connect(self.on_screen_added)
+        app.screenRemoved.connect(self.on_screen_removed)
+        app.primaryScreenChanged.connect(self.rebuild)
+        for screen in app.screens():
+            self.watch(screen)
+        self.rebuild()
+
+    def watch(self, screen):
+        # Holding the screens themselves; an id() could be reused by the next screen plugged in
+        if screen in self.watched:
+            return
+        self.watched.add(screen)
+        screen.availableGeometryChanged.connect(self.rebuild)
+        screen.geometryChanged.connect(self.rebuild)
+
+    def on_screen_added(self, screen):
+        self.watch(screen)
+        self.rebuild()
+
+    def on_screen_removed(self, screen):
+        self.watched.discard(screen)
+        self.rebuild()
+
+    def rebuild(self, *args):
+        rects = []
+        for screen in self.app.screens():
+            geo = screen.availableGeometry()
+            rects.append((geo.left(), geo.top(), geo.right(), geo.bottom()))
+        self.surfaces = Surfaces(rects)
+        self.rebuilds += 1
+        self.changed.emit()
+
+_graph = None
+
+def get_screen_graph():
+    global _graph
+    if _graph is None:
+        _graph = ScreenGraph(QApplication.instance())
+    return _graph
@@ -0,0 +1,120 @@
+import math
+import time
+import queue
+from collections import namedtuple
+from PyQt6.QtCore import QThread, QPoint
+from pet_system import PetState
+
+# Published by the simulation thread and never mutated, so the GUI thread can hold one without locking
+RenderSnapshot = namedtuple('RenderSnapshot', [
+    'seq', 'input_seq', 'frame', 'loader', 'tints', 'window_x', 'window_y', 'prefetch',
+    'name', 'state', 'mood', 'hunger', 'energy',
+])
+
+class SimulationThread(QThread):
+    def __init__(self, pet, walker, x, y, width, height, tick_ms=16, parent=None):
+        super().__init__(parent)
+        self.pet = pet
+        self.walker = walker
+        self.tick_ms = tick_ms
+        self.width = width
+        self.height = height
+        self.x = float(x)
+        self.y = float(y)
+        self.pressed = False
+
+        # Written by the GUI thread; a plain attribute store is atomic
+        self.cursor = (0, 0)
+
+        self.inputs = queue.SimpleQueue()
+        self.input_seq = 0
+        self.applied_seq = 0
+
+        self.buffers = [None, None]
+        self.front = 0
+        self.seq = 0
+        self.prefetch_key = None
+        self.prefetch = ()
+        self.steps = 0
+        self.overruns = 0
+        self.publish()
+
+    def send(self, kind, *args):
+        # GUI thread only; the returned number lets the caller tell which snapshots already reflect this input
+        self.input_seq += 1
+        self.inputs.put((self.input_seq, kind, args))
+        return self.input_seq
+
+    def snapshot(self):
+        return self.buffers[self.front]
+
+    def publish(self):
+        pet = self.pet
+        key = (pet.current_state, pet.mood, id(pet.animations))
+        if key != self.prefetch_key:
+            self.prefetch_key = key
+            self.prefetch = tuple(reversed(pet.plan_prefetch()))
+
+        self.seq += 1
+        back = 1 - self.front
+        self.buffers[back] = RenderSnapshot(
+            self.seq, self.applied_seq, pet.render_frame(), pet.loader, pet.tints,
+            math.floor(self.x), math.floor(self.y), self.prefetch,
+            pet.name, pet.current_state, pet.mood, pet.hunger, pet.energy,
+        )
+        self.front = back
+
+    def apply_inputs(self):
+        pet = self.pet
+        while True:
+            try:
+                seq, kind, args = self.inputs.get_nowait()
+            except queue.Empty:
+                return
+            if kind == 'press':
+                self.pressed = True
+                pet.handle_interaction('click')
+            elif kind == 'release':
+                self.pressed = False
+            elif kind == 'move':
+                self.x, self.y = args
+                self.walker.reset()
+            elif kind == 'feed':
+                pet.feed()
+            elif kind == 'style':
+                pet.load_style(*args)
+            self.applied_seq = seq
+
+    def step(self):
+        self.apply_inputs()
+        # While the mouse is held the pet is paused, like the single-threaded game loop
+        if not self.pressed:
+            pet = self.pet
+            mouse_pos = QPoint(*self.cursor)
+            window_pos = QPoint(math.floor(self.x), math.floor(self.y))
+            pet.update(self.tick_ms, mouse_pos, window_pos)
+
+            self.x, self.y = self.walker.step(pet, self.x, self.y, self.width, self.height, mouse_pos.x())
+
+            if pet.current_state == PetState.CORNER_POP:
+                pet.rotation = 0
+        self.steps += 1
+        self.publish()
+
+    def run(self):
+        interval = self.tick_ms / 1000.0
+        next_step = time.perf_counter()
+        while not self.isInterruptionRequested():
+            self.step()
+            next_step += interval
+            delay = next_step - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind: carry on from now instead of replaying the missed steps in a burst
+                self.overruns += 1
+                next_step = time.perf_counter()
+
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
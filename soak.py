@@ -0,0 +1,209 @@
+import os
+import sys
+import gc
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import Qt, QPoint, QPointF, QEvent
+from PyQt6.QtGui import QImage, QMouseEvent
+
+MS_PER_MINUTE = 60000
+MS_PER_HOUR = 60 * MS_PER_MINUTE
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def mouse_event(kind, pos):
+    point = QPointF(pos)
+    return QMouseEvent(kind, point, point, Qt.MouseButton.LeftButton, Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier)
+
+class SoakRun:
+    def __init__(self, manager, window, args, workdir):
+        self.manager = manager
+        self.window = window
+        self.args = args
+        self.snapshot_path = os.path.join(workdir, 'baseline.tracemalloc')
+        self.rng = random.Random(args.seed)
+        self.canvas = QImage(window.width(), window.height(), QImage.Format.Format_ARGB32_Premultiplied)
+        self.virtual_ms = 0
+        self.latencies = []
+        self.failures = []
+        self.style_index = 0
+
+    def pixmap_count(self):
+        # Every shared cache, not just the current style, so frames kept for old styles count as growth
+        from pet_system import shared_loaders, shared_tint_caches
+        return (sum(loader.resident_count() for loader in shared_loaders())
+                + sum(len(tints.variants) for tints in shared_tint_caches()))
+
+    def interact(self):
+        window = self.window
+        roll = self.rng.random()
+        if roll < 0.5:
+            pos = window.window_state.pos() + window.rect().center()
+            window.mousePressEvent(mouse_event(QEvent.Type.MouseButtonPress, pos))
+            if self.rng.random() < 0.3:
+                window.mouseMoveEvent(mouse_event(QEvent.Type.MouseMove, pos + QPoint(40, 0)))
+                window.game_loop()
+            window.mouseReleaseEvent(mouse_event(QEvent.Type.MouseButtonRelease, pos))
+        elif roll < 0.8:
+            window.pet.feed()
+        else:
+            window.registry.refresh()
+
+    def change_style(self):
+        names = self.window.registry.names()
+        if names:
+            self.style_index = (self.style_index + 1) % len(names)
+            self.window.set_style(names[self.style_index])
+
+    def tick(self, paint):
+        started = time.perf_counter()
+        self.window.game_loop()
+        if paint:
+            self.canvas.fill(0)
+            self.window.render(self.canvas)
+        self.latencies.append(time.perf_counter() - started)
+        previous_second = self.virtual_ms // 1000
+        self.virtual_ms += self.window.tick_ms
+        if self.virtual_ms // 1000 != previous_second:
+            # The manager's housekeeping timer runs on wall time; drive it from the virtual clock instead
+            self.manager.housekeeping()
+
+    def sample(self, label, take_snapshot=False):
+        QApplication.processEvents()
+        gc.collect()
+        if take_snapshot:
+            # Kept on disk so the snapshot's own objects never show up in the counts
+            tracemalloc.take_snapshot().dump(self.snapshot_path)
+            gc.collect()
+        objects = gc.get_objects()
+        latencies = sorted(self.latencies)
+        self.latencies = []
+        sample = {
+            'label': label,
+            'objects': len(objects),
+            'types': Counter(type(obj).__name__ for obj in objects),
+            'traced': tracemalloc.get_traced_memory()[0],
+            'pixmaps': self.pixmap_count(),
+            'p50': percentile(latencies, 0.50) * 1000,
+            'p95': percentile(latencies, 0.95) * 1000,
+            'p99': percentile(latencies, 0.99) * 1000,
+        }
+        del objects
+        print(f"{label:>10}  objects {sample['objects']:>8}  traced {sample['traced'] / 1024:>9.1f} KiB  "
+              f"pixmaps {sample['pixmaps']:>4}  p50 {sample['p50']:.3f} ms  p95 {sample['p95']:.3f} ms  p99 {sample['p99']:.3f} ms")
+        return sample
+
+    def check(self, baseline, sample):
+        args = self.args
+        label = sample['label']
+        grown = sample['objects'] - baseline['objects']
+        if grown > max(args.max_object_growth, baseline['objects'] * args.max_growth_ratio):
+            top = (sample['types'] - baseline['types']).most_common(5)
+            self.failures.append(f"{label}: {grown} more live objects than baseline; top growth {top}")
+
+        traced = sample['traced'] - baseline['traced']
+        if traced > args.max_traced_growth_kb * 1024:
+            own_frames = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            baseline_snapshot = tracemalloc.Snapshot.load(self.snapshot_path).filter_traces(own_frames)
+            current = tracemalloc.take_snapshot().filter_traces(own_frames)
+            top = current.compare_to(baseline_snapshot, 'lineno')[:5]
+            lines = "; ".join(str(stat) for stat in top)
+            self.failures.append(f"{label}: traced memory grew {traced / 1024:.1f} KiB; top growth {lines}")
+
+        if sample['pixmaps'] > args.max_pixmaps:
+            self.failures.append(f"{label}: {sample['pixmaps']} pixmaps resident (limit {args.max_pixmaps})")
+
+        limit = max(baseline['p99'] * args.max_latency_drift, baseline['p99'] + args.latency_slack_ms)
+        if sample['p99'] > limit:
+            self.failures.append(f"{label}: p99 tick latency {sample['p99']:.3f} ms drifted past {limit:.3f} ms")
+
+        pet = self.window.pet
+        if not (0 <= pet.hunger <= 100 and 0 <= pet.energy <= 100) or pet.current_state not in pet.animations:
+            self.failures.append(f"{label}: pet left its valid range (state {pet.current_state}, hunger {pet.hunger}, energy {pet.energy})")
+
+    def run(self):
+        args = self.args
+        total_ticks = int(args.days * 24 * MS_PER_HOUR / self.window.tick_ms)
+        ticks_per_sample = int(args.sample_minutes * MS_PER_MINUTE / self.window.tick_ms)
+        ticks_per_interaction = max(1, int(args.interaction_seconds * 1000 / self.window.tick_ms))
+        ticks_per_style = max(1, int(args.style_minutes * MS_PER_MINUTE / self.window.tick_ms))
+
+        baseline = None
+        samples_taken = 0
+        for tick in range(1, total_ticks + 1):
+            if tick % ticks_per_interaction == 0:
+                self.interact()
+            self.tick(tick % args.paint_every == 0)
+
+            if tick % ticks_per_sample == 0:
+                hours = self.virtual_ms / MS_PER_HOUR
+                samples_taken += 1
+                # The first sample is warm-up; by the second every style and tint has been touched
+                sample = self.sample(f"{hours:.1f}h", take_snapshot=samples_taken == 2)
+                if samples_taken == 2:
+                    baseline = sample
+                elif baseline is not None:
+                    self.check(baseline, sample)
+            # After sampling, so samples see a style that has settled rather than one just switched to
+            if tick % ticks_per_style == 0:
+                self.change_style()
+        return not self.failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive a PetWindow offscreen on a virtual clock and fail on leaks or latency drift.")
+    parser.add_argument('--days', type=float, default=1.0, help="simulated days to run")
+    parser.add_argument('--tick-ms', type=int, default=16, help="virtual milliseconds per tick; larger values compress time")
+    parser.add_argument('--paint-every', type=int, default=4, help="paint one tick in N")
+    parser.add_argument('--sample-minutes', type=float, default=60, help="simulated minutes between samples")
+    parser.add_argument('--interaction-seconds', type=float, default=45, help="simulated seconds between clicks, drags and feeds")
+    parser.add_argument('--style-minutes', type=float, default=20, help="simulated minutes between style changes")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--max-object-growth', type=int, default=2000)
+    parser.add_argument('--max-growth-ratio', type=float, default=0.02)
+    parser.add_argument('--max-traced-growth-kb', type=float, default=1024)
+    parser.add_argument('--max-pixmaps', type=int, default=200, help="resident frames and tint variants across all styles (one 10x10 sheet plus a full tint cache is 196)")
+    parser.add_argument('--max-latency-drift', type=float, default=2.0)
+    parser.add_argument('--latency-slack-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    tracemalloc.start()
+
+    import main as chirpet
+
+    workdir = tempfile.mkdtemp(prefix='chirpet-soak-')
+    chirpet.CONFIG_FILE = os.path.join(workdir, 'config.json')
+
+    random.seed(args.seed)
+    # Through a PetManager so the production cleanup of loaders and the memory budget run too
+    manager = chirpet.PetManager(app)
+    manager.housekeeping_timer.stop()
+    window = manager.spawn('Default')
+    window.timer.stop()
+    window.tick_ms = args.tick_ms
+
+    run = SoakRun(manager, window, args, workdir)
+    ok = run.run()
+    window.close()
+
+    if ok:
+        print(f"PASS: {args.days} simulated day(s)")
+        return 0
+    for failure in run.failures:
+        print(f"FAIL: {failure}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import os
+import json
+from collections import namedtuple
+from PIL import Image
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage
+from pet_system import resource_path, manifest_grid
+
+SHEET_SUFFIX = 'spritesheet.png'
+THUMBNAIL_FRAME = 10
+THUMBNAIL_SIZE = 32
+
+Style = namedtuple('Style', ['name', 'path', 'manifest', 'mtime'])
+
+def style_name_from_sheet(filename):
+    stem = filename[:-len(SHEET_SUFFIX)]
+    return stem.capitalize() if stem else filename
+
+class ThumbnailJob(QRunnable):
+    def __init__(self, registry, style):
+        super().__init__()
+        self.registry = registry
+        self.style = style
+
+    def run(self):
+        manifest = self.style.manifest
+        cols, rows = manifest_grid(manifest)
+        frame = manifest.get('thumbnail_frame')
+        if frame is not None and (not isinstance(frame, int) or isinstance(frame, bool) or frame < 0):
+            print(f"Error: Bad thumbnail_frame for {self.style.name}: {frame!r}")
+            frame = None
+        try:
+            with Image.open(self.style.path) as sheet:
+                if getattr(sheet, 'is_animated', False):
+                    sheet.seek(min(frame or 0, sheet.n_frames - 1))
+                    tile = sheet.convert("RGBA")
+                else:
+                    tile_w = sheet.width // cols
+                    tile_h = sheet.height // rows
+                    row, col = divmod(min(THUMBNAIL_FRAME if frame is None else frame, cols * rows - 1), cols)
+                    tile = sheet.crop((col * tile_w, row * tile_h, (col + 1) * tile_w, (row + 1) * tile_h)).convert("RGBA")
+        except OSError as e:
+            print(f"Error: Could not render thumbnail for {self.style.name}: {e}")
+            return
+        tile.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        data = tile.tobytes("raw", "RGBA")
+        # QImage (unlike QPixmap) may be built off the GUI thread; copy() detaches it from data
+        image = QImage(data, tile.width, tile.height, tile.width * 4, QImage.Format.Format_RGBA8888).copy()
+        try:
+            self.registry.thumbnail_ready.emit(self.style.name, self.style.mtime, image)
+        except RuntimeError:
+            # The registry was torn down while the app was shutting down
+            pass
+
+class StyleRegistry(QObject):
+    styles_changed = pyqtSignal()
+    thumbnail_ready = pyqtSignal(str, float, QImage)
+
+    def __init__(self, assets_dir='assets'):
+        super().__init__()
+        self.assets_dir = resource_path(assets_dir)
+        self.styles = {}
+        self.dir_mtime = None
+        self.file_mtimes = {}
+        self.thumbnails = {}
+        self.pending_thumbnails = set()
+        self.pool = QThreadPool.globalInstance()
+        self.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.refresh()
+
+    def names(self):
+        return list(self.styles)
+
+    def get(self, name):
+        return self.styles.get(name)
+
+    def refresh(self):
+        # Cheap when nothing changed: one stat for the folder and one per known file
+        try:
+            dir_mtime = os.stat(self.assets_dir).st_mtime
+        except OSError:
+            return False
+
+        if dir_mtime == self.dir_mtime and not self.files_changed():
+            return False
+
+        self.dir_mtime = dir_mtime
+        styles = self.scan()
+        if list(styles.items()) == list(self.styles.items()):
+            return False
+
+        self.styles = styles
+        self.styles_changed.emit()
+        return True
+
+    def files_changed(self):
+        for path, mtime in self.file_mtimes.items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def scan(self):
+        file_mtimes = {}
+        found = []
+        claimed_sheets = set()
+        filenames = sorted(os.listdir(self.assets_dir))
+
+        for filename in filenames:
+            if not filename.endswith('.json'):
+                continue
+            manifest_path = os.path.join(self.assets_dir, filename)
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error: Could not read style manifest {manifest_path}: {e}")
+                continue
+            if not isinstance(manifest, dict) or 'sheet' not in manifest:
+                continue
+            sheet_path = os.path.join(self.assets_dir, manifest['sheet'])
+            if not os.path.exists(sheet_path):
+                continue
+            file_mtimes[manifest_path] = os.stat(manifest_path).st_mtime
+            file_mtimes[sheet_path] = os.stat(sheet_path).st_mtime
+            claimed_sheets.add(os.path.normcase(sheet_path))
+            name = manifest.get('name', style_name_from_sheet(manifest['sheet']))
+            found.append(Style(name, sheet_path, manifest, max(file_mtimes[manifest_path], file_mtimes[sheet_path])))
+
+        for filename in filenames:
+            if not filename.endswith(SHEET_SUFFIX):
+                continue
+            sheet_path = os.path.join(self.assets_dir, filename)
+            if os.path.normcase(sheet_path) in claimed_sheets:
+                continue
+            file_mtimes[sheet_path] = os.stat(sheet_path).st_mtime
+            found.append(Style(style_name_from_sheet(filename), sheet_path, {}, file_mtimes[sheet_path]))
+
+        self.file_mtimes = file_mtimes
+        found.sort(key=lambda style: (style.name != 'Default', style.manifest.get('order', 0), style.name))
+        return {style.name: style for style in found}
+
+    def thumbnail(self, name):
+        style = self.styles.get(name)
+        if style is None:
+            return None
+        cached = self.thumbnails.get(name)
+        if cached and cached[0] == style.mtime:
+            return cached[1]
+        if (name, style.mtime) not in self.pending_thumbnails:
+            self.pending_thumbnails.add((name, style.mtime))
+            self.pool.start(ThumbnailJob(self, style))
+        return None
+
+    def on_thumbnail_ready(self, name, mtime, image):
+        self.pending_thumbnails.discard((name, mtime))
+        self.thumbnails[name] = (mtime, image)
+
+_registry = None
+
+def get_style_registry():
+    global _registry
+    if _registry is None:
+        _registry = StyleRegistry()
+    return _registry
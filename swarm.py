@@ -0,0 +1,274 @@
+import random
+import numpy as np
+from pet_system import (
+    PetState, PetMood, BEHAVIOR_TABLES, MOOD_ENTRY_STATES, SOUNDS,
+    build_animations, random_mood, random_sentence,
+)
+
+MOVING_STATES = [PetState.MOVE_RIGHT, PetState.MOVE_LEFT, PetState.MOONWALK_RIGHT, PetState.MOONWALK_LEFT]
+TIRING_STATES = [PetState.ZOOMIES, PetState.CHASE, PetState.MOVE_RIGHT, PetState.MOVE_LEFT]
+FACING_LEFT_STATES = [PetState.MOVE_LEFT, PetState.CEILING_WALK_LEFT]
+FACING_RIGHT_STATES = [PetState.MOVE_RIGHT, PetState.CEILING_WALK_RIGHT]
+TIMED_STATES = [(PetState.SPIN, 1000.0), (PetState.JUMP, 500.0), (PetState.SHAKE, 500.0)]
+STATE_COUNT = max(value for name, value in vars(PetState).items() if name.isupper()) + 1
+
+class AnimationTable:
+    def __init__(self, animations):
+        longest = max(len(anim['frames']) for anim in animations.values())
+        self.frames = np.full((STATE_COUNT, longest), 10, np.int64)
+        self.lengths = np.ones(STATE_COUNT, np.int64)
+        self.intervals = np.full(STATE_COUNT, np.inf)
+        self.loops = np.ones(STATE_COUNT, bool)
+        self.nexts = np.full(STATE_COUNT, -1, np.int64)
+
+        for state, anim in animations.items():
+            frames = list(anim['frames'])
+            self.frames[state, :len(frames)] = frames
+            self.lengths[state] = len(frames)
+            self.intervals[state] = anim['interval']
+            self.loops[state] = anim['loop']
+            self.nexts[state] = anim.get('next', -1)
+
+class BehaviorTable:
+    def __init__(self, tables):
+        width = max(len(entries) for entries in tables.values()) + 1
+        moods = max(tables) + 1
+        # Unused slots can never match; the last slot always does, like choose_behavior's fallback
+        self.thresholds = np.full((moods, width), -np.inf)
+        self.thresholds[:, -1] = np.inf
+        self.first = np.full((moods, width), PetState.IDLE, np.int64)
+        self.second = np.full((moods, width), -1, np.int64)
+
+        for mood, entries in tables.items():
+            for column, (threshold, choices) in enumerate(entries):
+                self.thresholds[mood, column] = threshold
+                self.first[mood, column] = choices[0]
+                if len(choices) == 2:
+                    self.second[mood, column] = choices[1]
+
+    def select(self, moods, rolls):
+        column = (rolls[:, None] < self.thresholds[moods]).argmax(axis=1)
+        return self.first[moods, column], self.second[moods, column]
+
+class Swarm:
+    def __init__(self, count, seeds=None, manifest=None, name="ChirPet"):
+        self.count = count
+        self.name = name
+        if seeds is None:
+            self.rngs = [random.Random() for _ in range(count)]
+        else:
+            self.rngs = [random.Random(seed) for seed in seeds]
+
+        self.animations = AnimationTable(build_animations(manifest))
+        self.behaviors = BehaviorTable(BEHAVIOR_TABLES)
+
+        self.state = np.full(count, PetState.SPAWN, np.int64)
+        self.frame_index = np.zeros(count, np.int64)
+        self.frame_timer = np.zeros(count)
+        self.bob_timer = np.zeros(count)
+        self.direction = np.ones(count, np.int64)
+        self.zoomies_left = np.zeros(count, bool)
+
+        self.speech_timer = np.zeros(count)
+        self.next_speech_time = np.full(count, 5000.0)
+
+        self.mood = np.full(count, PetMood.HAPPY, np.int64)
+        self.mood_timer = np.zeros(count)
+        self.mood_duration = np.full(count, 30000.0)
+
+        self.hunger = np.zeros(count, np.int64)
+        self.energy = np.full(count, 100.0)
+        self.hunger_timer = np.zeros(count)
+        self.energy_timer = np.zeros(count)
+
+    def draw(self, indices):
+        rngs = self.rngs
+        return np.fromiter((rngs[i].random() for i in indices), float, len(indices))
+
+    def set_state(self, mask, new_state):
+        targets = np.broadcast_to(new_state, self.state.shape)
+        changed = mask & (self.state != targets)
+        self.state[changed] = targets[changed]
+        self.frame_index[changed] = 0
+        self.frame_timer[changed] = 0
+        self.direction[changed & np.isin(targets, FACING_LEFT_STATES)] = -1
+        self.direction[changed & np.isin(targets, FACING_RIGHT_STATES)] = 1
+
+    def set_state_at(self, index, new_state):
+        mask = np.zeros(self.count, bool)
+        mask[index] = True
+        self.set_state(mask, new_state)
+
+    def sprite_frames(self):
+        table = self.animations
+        position = np.minimum(self.frame_index, table.lengths[self.state] - 1)
+        frames = table.frames[self.state, position]
+        # Like PetSystem.animation_frames, zoomies use the walk-left frames after turning around
+        left = table.frames[PetState.MOVE_LEFT, position % table.lengths[PetState.MOVE_LEFT]]
+        swapped = (self.state == PetState.ZOOMIES) & self.zoomies_left
+        return np.where(swapped, left, frames)
+
+    def step(self, dt_ms):
+        # Mirrors PetSystem.update(dt_ms) with no mouse position, one phase at a time for every pet
+        table = self.animations
+        start_state = self.state.copy()
+        self.frame_timer += dt_ms
+        self.bob_timer += dt_ms
+        running = np.ones(self.count, bool)
+
+        self.set_state((start_state == PetState.SPAWN) & (self.bob_timer > 1000), PetState.IDLE)
+
+        for state, duration in TIMED_STATES:
+            in_state = start_state == state
+            finished = in_state & (self.frame_timer / duration >= 1.0)
+            self.set_state(finished, PetState.IDLE)
+            running &= ~(in_state & ~finished)
+
+        zooming = start_state == PetState.ZOOMIES
+        turning = np.flatnonzero(zooming & (np.mod(self.frame_timer, 500) < dt_ms))
+        if len(turning):
+            turned = turning[self.draw(turning) < 0.3]
+            self.direction[turned] *= -1
+            self.zoomies_left[turned] = self.direction[turned] != 1
+        self.set_state(zooming & (self.bob_timer > 3000), PetState.IDLE)
+
+        self.set_state((start_state == PetState.SLEEP) & (self.bob_timer > 20000), PetState.IDLE)
+
+        talking = running & (self.speech_timer > 0)
+        self.speech_timer[talking] -= dt_ms
+        self.next_speech_time[running] -= dt_ms
+        for i in np.flatnonzero(running & (self.next_speech_time <= 0)):
+            random_sentence(self.rngs[i], self.name, SOUNDS)
+            self.speech_timer[i] = 3000
+            self.set_state_at(i, PetState.SPEAK)
+            self.next_speech_time[i] = self.rngs[i].randint(30000, 90000)
+
+        self.mood_timer[running] += dt_ms
+        for i in np.flatnonzero(running & (self.mood_timer > self.mood_duration)):
+            mood, duration = random_mood(self.rngs[i])
+            self.mood[i] = mood
+            self.mood_timer[i] = 0
+            self.mood_duration[i] = duration
+            if mood in MOOD_ENTRY_STATES:
+                self.set_state_at(i, MOOD_ENTRY_STATES[mood])
+
+        self.hunger_timer[running] += dt_ms
+        fed = running & (self.hunger_timer > 5000)
+        self.hunger[fed] = np.minimum(100, self.hunger[fed] + 1)
+        self.hunger_timer[fed] = 0
+
+        self.energy_timer[running] += dt_ms
+        tick = running & (self.energy_timer > 5000)
+        sleeping = tick & (self.state == PetState.SLEEP)
+        tiring = tick & ~sleeping & np.isin(self.state, TIRING_STATES)
+        resting = tick & ~sleeping & ~tiring
+        self.energy[sleeping] = np.minimum(100, self.energy[sleeping] + 5)
+        self.energy[tiring] = np.maximum(0, self.energy[tiring] - 2)
+        self.energy[resting] = np.maximum(0, self.energy[resting] - 0.5)
+        self.energy_timer[tick] = 0
+
+        hungry = running & (self.hunger > 80)
+        grumpy = hungry & (self.mood != PetMood.GRUMPY) & (self.mood != PetMood.SLEEPY)
+        self.mood[grumpy] = PetMood.GRUMPY
+        self.speech_timer[grumpy] = 2000
+        tired = running & ~hungry & (self.energy < 20) & (self.mood != PetMood.SLEEPY)
+        self.mood[tired] = PetMood.SLEEPY
+        self.speech_timer[tired] = 2000
+
+        advance = running & (self.frame_timer >= table.intervals[start_state])
+        self.frame_timer[advance] = 0
+        self.frame_index[advance] += 1
+        ended = advance & (self.frame_index >= table.lengths[start_state])
+        looped = ended & table.loops[start_state]
+        self.frame_index[looped] = 0
+
+        idle = np.flatnonzero(looped & (start_state == PetState.IDLE))
+        moving = np.flatnonzero(looped & np.isin(start_state, MOVING_STATES))
+        if len(idle):
+            # The idle loop rolls twice; only the second roll is used to pick a behavior
+            self.draw(idle[self.draw(idle) < 0.3])
+            rolling = idle[self.draw(idle) < 0.3]
+            if len(rolling):
+                first, second = self.behaviors.select(self.mood[rolling], self.draw(rolling))
+                picks = first.copy()
+                paired = np.flatnonzero(second >= 0)
+                if len(paired):
+                    coins = self.draw(rolling[paired])
+                    picks[paired] = np.where(coins < 0.5, first[paired], second[paired])
+                targets = self.state.copy()
+                targets[rolling] = picks
+                mask = np.zeros(self.count, bool)
+                mask[rolling] = True
+                self.set_state(mask, targets)
+
+        if len(moving):
+            stopping = np.zeros(self.count, bool)
+            stopping[moving[self.draw(moving) < 0.20]] = True
+            self.set_state(stopping, PetState.IDLE)
+
+        finished = ended & ~table.loops[start_state]
+        chained = finished & (table.nexts[start_state] >= 0)
+        self.set_state(chained, table.nexts[start_state])
+        held = finished & ~chained
+        self.frame_index[held] = table.lengths[start_state][held] - 1
+
+    def run(self, ticks, dt_ms=16):
+        for _ in range(ticks):
+            self.step(dt_ms)
+
+    def snapshot(self, index):
+        return {
+            'state': int(self.state[index]),
+            'frame_index': int(self.frame_index[index]),
+            'frame_timer': float(self.frame_timer[index]),
+            'bob_timer': float(self.bob_timer[index]),
+            'direction': int(self.direction[index]),
+            'mood': int(self.mood[index]),
+            'mood_timer': float(self.mood_timer[index]),
+            'hunger': int(self.hunger[index]),
+            'energy': float(self.energy[index]),
+            'speech_timer': float(self.speech_timer[index]),
+        }
+
+def pet_snapshot(pet):
+    return {
+        'state': pet.current_state,
+        'frame_index': pet.current_frame_index,
+        'frame_timer': float(pet.frame_timer),
+        'bob_timer': float(pet.bob_timer),
+        'direction': pet.direction,
+        'mood': pet.mood,
+        'mood_timer': float(pet.mood_timer),
+        'hunger': pet.hunger,
+        'energy': float(pet.energy),
+        'speech_timer': float(pet.speech_timer),
+    }
+
+def compare_with_pet_systems(count=16, ticks=20000, seed=0, dt_ms=16):
+    from pet_system import PetSystem
+
+    seeds = [seed + i for i in range(count)]
+    pets = [PetSystem(seed=pet_seed) for pet_seed in seeds]
+    swarm = Swarm(count, seeds)
+    for tick in range(ticks):
+        swarm.step(dt_ms)
+        for i, pet in enumerate(pets):
+            pet.update(dt_ms)
+            expected = pet_snapshot(pet)
+            actual = swarm.snapshot(i)
+            if actual != expected:
+                return tick, i, expected, actual
+    return None
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    swarm = Swarm(count, seeds=range(count))
+    started = time.perf_counter()
+    swarm.run(1000)
+    elapsed = time.perf_counter() - started
+    print(f"{count} pets x 1000 ticks in {elapsed:.2f}s ({count * 1000 / elapsed:,.0f} pet-ticks/s)")
+    states, counts = np.unique(swarm.state, return_counts=True)
+    print("States:", {int(state): int(n) for state, n in zip(states, counts)})